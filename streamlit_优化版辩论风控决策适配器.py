@@ -441,19 +441,19 @@ def analyze_optimized_trading_for_streamlit(commodity: str, analysis_date: str,
     )
     
     # 添加一些模拟的分析结果
-    analysis_state.inventory_analysis = ModuleAnalysisResult(
+    analysis_state.set_module_result("inventory", ModuleAnalysisResult(
         module_name="inventory",
         commodity=commodity,
         analysis_date=analysis_date,
         status=AnalysisStatus.COMPLETED
-    )
+    ))
     
-    analysis_state.positioning_analysis = ModuleAnalysisResult(
+    analysis_state.set_module_result("positioning", ModuleAnalysisResult(
         module_name="positioning", 
         commodity=commodity,
         analysis_date=analysis_date,
         status=AnalysisStatus.COMPLETED
-    )
+    ))
     
     # 创建适配器并运行分析
     adapter = StreamlitOptimizedTradingAdapter(config)
@@ -1013,6 +1013,9 @@ class StreamlitAnalysisManager:
                     try:
                         return loop.run_until_complete(coro)
                     finally:
+                        # 关闭本循环下的共享HTTP客户端后再销毁循环，避免每次分析泄漏连接
+                        from 期货TradingAgents系统_工具模块 import close_shared_http_clients
+                        loop.run_until_complete(close_shared_http_clients())
                         loop.close()
                 
                 # 使用线程执行
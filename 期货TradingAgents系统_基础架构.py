@@ -5,14 +5,24 @@
 提供系统核心的数据结构和基础功能
 """
 
+import sys
+import copy
 import json
+import time
+import atexit
+import bisect
 import asyncio
 import logging
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 from enum import Enum
+import numpy as np
 import pandas as pd
 
 # ============================================================================
@@ -33,11 +43,23 @@ class DebateStance(Enum):
     BEARISH = "bearish"
     NEUTRAL = "neutral"
 
+# 标准信心度文字及数值映射阈值（>=0.5为中，>=0.7为高）
+VALID_CONFIDENCE_LEVELS = frozenset(('高', '中', '低'))
+CONFIDENCE_THRESHOLDS = (0.5, 0.7)
+CONFIDENCE_LABELS = ('低', '中', '高')
+
+# 视为"未设定"的仓位限制文字（风控必须给出具体限制）
+UNSET_POSITION_LIMITS = frozenset(("", "0", "0.0", "待评估"))
+
+
 # ============================================================================
 # 2. 核心数据结构
 # ============================================================================
 
-@dataclass
+# Python 3.10+ 为高频创建的数据结构启用__slots__，减少内存占用并加快属性访问
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**DATACLASS_SLOTS)
 class ModuleAnalysisResult:
     """模块分析结果"""
     module_name: str
@@ -60,9 +82,15 @@ class CrossModuleRelationship:
     strength: float
     description: str
 
-@dataclass
+# 六大分析模块名称（顺序即结果汇总顺序，对应字段为 f"{name}_analysis"）
+ANALYSIS_MODULES = ('inventory', 'positioning', 'term_structure', 'technical', 'basis', 'news')
+
+@dataclass(**DATACLASS_SLOTS)
 class FuturesAnalysisState:
-    """期货分析状态"""
+    """期货分析状态
+    
+    进度和已完成模块每次按各模块结果字段现算，直接给字段赋值或事后修改结果状态都能正确反映
+    """
     commodity: str
     analysis_date: str
     
@@ -84,34 +112,15 @@ class FuturesAnalysisState:
     
     def get_analysis_progress(self) -> float:
         """获取分析进度"""
-        modules = [
-            self.inventory_analysis,
-            self.positioning_analysis,
-            self.term_structure_analysis,
-            self.technical_analysis,
-            self.basis_analysis,
-            self.news_analysis
-        ]
-        
-        completed_count = sum(1 for module in modules if module and module.status == AnalysisStatus.COMPLETED)
-        return completed_count / len(modules)
+        return len(self.get_completed_modules()) / len(ANALYSIS_MODULES)
     
     def get_completed_modules(self) -> List[str]:
-        """获取已完成模块列表"""
+        """获取已完成模块列表（按ANALYSIS_MODULES顺序）"""
         completed = []
-        modules = {
-            'inventory': self.inventory_analysis,
-            'positioning': self.positioning_analysis,
-            'term_structure': self.term_structure_analysis,
-            'technical': self.technical_analysis,
-            'basis': self.basis_analysis,
-            'news': self.news_analysis
-        }
-        
-        for name, module in modules.items():
-            if module and module.status == AnalysisStatus.COMPLETED:
+        for name in ANALYSIS_MODULES:
+            module = getattr(self, f"{name}_analysis")
+            if module is not None and module.status == AnalysisStatus.COMPLETED:
                 completed.append(name)
-                
         return completed
     
     def get_module_result(self, module_name: str) -> Optional[ModuleAnalysisResult]:
@@ -126,7 +135,7 @@ class FuturesAnalysisState:
         }
         return module_map.get(module_name)
     
-    def set_module_result(self, module_name: str, result: ModuleAnalysisResult):
+    def set_module_result(self, module_name: str, result: Optional[ModuleAnalysisResult]):
         """设置模块结果"""
         if module_name == 'inventory':
             self.inventory_analysis = result
@@ -252,6 +261,91 @@ class FuturesTradingAgentsConfig:
 # 4. 分析整合器
 # ============================================================================
 
+# 辩论风控结果转换失败时返回的默认结构
+_CONVERSION_FAILURE_TEMPLATE = {
+    "success": False,
+    "error": "数据转换失败",
+    "commodity": "未知",
+    "analysis_date": "未知",
+    "debate_section": {"winner": "未知", "scores": {"bull": 0.0, "bear": 0.0}, "summary": "数据转换失败", "rounds": []},
+    "trading_section": {"strategy_type": "暂停交易", "position_size": "0%", "risk_reward_ratio": "N/A", "time_horizon": "短期", "reasoning": "数据转换失败"},
+    "risk_section": {"overall_risk": "高风险", "position_limit": "0%", "stop_loss": "立即止损", "manager_opinion": "数据转换失败"},
+    "decision_section": {
+        "final_decision": "持有观望", 
+        "position_size": "0%", 
+        "confidence": "0%", 
+        "rationale": ["数据转换失败"],
+        "execution_plan": "暂停交易，等待系统恢复",
+        "monitoring_points": ["系统状态监控"],
+        "cio_statement": "数据转换失败"
+    },
+    "process_timestamp": None
+}
+
+# CPU密集型模块（数值/DataFrame计算为主），在子进程池中运行以绕过GIL
+CPU_BOUND_MODULES = frozenset(('technical', 'term_structure'))
+
+def _prewarm_cpu_module_worker():
+    """子进程初始化：预先导入CPU密集型模块的适配器"""
+    import streamlit_enhanced_technical_adapter  # noqa: F401
+    import streamlit_ultimate_term_structure_adapter  # noqa: F401
+
+# 运行阻塞模块的专用线程池（留出超时后仍在运行的线程所占名额）；
+# 不使用事件循环默认线程池，超时后仍在运行的线程不会拖住asyncio.run的收尾
+_MODULE_THREAD_POOL = ThreadPoolExecutor(max_workers=len(ANALYSIS_MODULES) * 2, thread_name_prefix="analysis-module")
+
+# CPU密集型模块的子进程池：模块级共享、首次使用时创建，界面每次分析新建整合器也不会重复开进程
+_CPU_POOL: Optional[ProcessPoolExecutor] = None
+_CPU_POOL_LOCK = threading.Lock()
+
+def _get_cpu_pool() -> ProcessPoolExecutor:
+    """获取（必要时创建）共享的子进程池"""
+    global _CPU_POOL
+    with _CPU_POOL_LOCK:
+        if _CPU_POOL is None:
+            _CPU_POOL = ProcessPoolExecutor(
+                max_workers=len(CPU_BOUND_MODULES),
+                initializer=_prewarm_cpu_module_worker
+            )
+        return _CPU_POOL
+
+def shutdown_cpu_pool():
+    """关闭共享的子进程池（进程退出时自动调用）"""
+    global _CPU_POOL
+    with _CPU_POOL_LOCK:
+        pool, _CPU_POOL = _CPU_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+atexit.register(shutdown_cpu_pool)
+
+def _run_coroutine_sync(coro_func: Callable, *args, **kwargs) -> Any:
+    """在当前（工作）线程中新建事件循环运行协程函数
+
+    部分适配器声明为async但内部是同步阻塞调用，须放到工作线程中运行，
+    否则会阻塞主事件循环，导致超时无法触发、各模块无法并行。
+    事件循环结束前关闭其下的共享HTTP客户端，避免连接泄漏。
+    """
+    from 期货TradingAgents系统_工具模块 import close_shared_http_clients
+    
+    async def run_and_close():
+        try:
+            return await coro_func(*args, **kwargs)
+        finally:
+            await close_shared_http_clients()
+    
+    return asyncio.run(run_and_close())
+
+def _run_cpu_bound_module(module_name: str, commodity: str, analysis_date: str) -> Dict[str, Any]:
+    """子进程入口：运行CPU密集型模块并返回结果字典"""
+    if module_name == 'technical':
+        from streamlit_enhanced_technical_adapter import analyze_technical_for_streamlit
+        return asyncio.run(analyze_technical_for_streamlit(commodity, analysis_date))
+    elif module_name == 'term_structure':
+        from streamlit_ultimate_term_structure_adapter import StreamlitUltimateTermStructureAdapter
+        return StreamlitUltimateTermStructureAdapter().analyze_variety_for_streamlit(commodity, analysis_date)
+    raise ValueError(f"模块 {module_name} 不支持在子进程中运行")
+
 class FuturesAnalysisIntegrator:
     """期货分析整合器 - 核心控制器"""
     
@@ -269,14 +363,107 @@ class FuturesAnalysisIntegrator:
             'basis': self._run_real_time_basis_analysis,
             'news': self._run_real_time_news_analysis
         }
+        
+        # 各模块超时时间（秒），超时的模块降级为失败结果，不阻塞整体流程
+        self.module_timeouts = {
+            'inventory': 60,
+            'positioning': 90,
+            'term_structure': 120,
+            'technical': 120,
+            'basis': 90,
+            'news': 90
+        }
+        self.module_timeouts.update(self.config.get("module_timeouts", {}))
+        
+        # CPU密集型模块是否在共享子进程池中运行
+        self.use_process_pool = self.config.get("use_process_pool", True)
+    
+    async def _run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """在线程池中运行阻塞调用，事件循环保持响应（模块超时可生效，各模块真正并行）"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_MODULE_THREAD_POOL, functools.partial(func, *args, **kwargs))
+    
+    async def _run_module_in_process(self, module_name: str, commodity: str, analysis_date: str) -> ModuleAnalysisResult:
+        """在子进程池中运行CPU密集型模块"""
+        default_confidence = {'technical': 0.7, 'term_structure': 0.85}
+        start_time = time.perf_counter()
+        
+        try:
+            loop = asyncio.get_running_loop()
+            result_data = await loop.run_in_executor(
+                _get_cpu_pool(), _run_cpu_bound_module, module_name, commodity, analysis_date
+            )
+        except BrokenProcessPool as e:
+            # 子进程池不可用时回退到当前进程运行
+            self.logger.warning(f"子进程池不可用，模块 {module_name} 改为在当前进程运行: {e}")
+            shutdown_cpu_pool()
+            self.use_process_pool = False
+            return await self.supported_modules[module_name](commodity, analysis_date)
+        except Exception as e:
+            return ModuleAnalysisResult(
+                module_name=module_name,
+                commodity=commodity,
+                analysis_date=analysis_date,
+                status=AnalysisStatus.FAILED,
+                error_message=str(e),
+                execution_time=time.perf_counter() - start_time
+            )
+        
+        execution_time = time.perf_counter() - start_time
+        if result_data.get("success", False):
+            return ModuleAnalysisResult(
+                module_name=module_name,
+                commodity=commodity,
+                analysis_date=analysis_date,
+                status=AnalysisStatus.COMPLETED,
+                result_data=result_data,
+                confidence_score=result_data.get("confidence_score", default_confidence[module_name]),
+                execution_time=execution_time
+            )
+        else:
+            return ModuleAnalysisResult(
+                module_name=module_name,
+                commodity=commodity,
+                analysis_date=analysis_date,
+                status=AnalysisStatus.FAILED,
+                error_message=result_data.get("error", "未知错误"),
+                execution_time=execution_time
+            )
+    
+    async def _run_module(self, module_name: str, commodity: str, analysis_date: str) -> ModuleAnalysisResult:
+        """运行单个分析模块（带超时保护）"""
+        timeout = self.module_timeouts.get(module_name, 120)
+        
+        if self.use_process_pool and module_name in CPU_BOUND_MODULES:
+            runner = self._run_module_in_process(module_name, commodity, analysis_date)
+        else:
+            runner = self.supported_modules[module_name](commodity, analysis_date)
+        
+        try:
+            return await asyncio.wait_for(runner, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"模块 {module_name} 分析超时（{timeout}秒）")
+            return ModuleAnalysisResult(
+                module_name=module_name,
+                commodity=commodity,
+                analysis_date=analysis_date,
+                status=AnalysisStatus.FAILED,
+                error_message=f"分析超时（{timeout}秒）",
+                execution_time=float(timeout)
+            )
     
     async def collect_all_analyses(self, commodity: str, analysis_date: str = None, 
-                                 selected_modules: List[str] = None) -> FuturesAnalysisState:
-        """收集所有分析模块的结果"""
+                                 selected_modules: List[str] = None,
+                                 progress_cb: Callable[[str, ModuleAnalysisResult], None] = None) -> FuturesAnalysisState:
+        """收集所有分析模块的结果
+        
+        每个模块完成后立即写入分析状态，并调用progress_cb(module_name, result)通知界面更新进度
+        """
         if analysis_date is None:
             analysis_date = datetime.now().strftime('%Y-%m-%d')
         
-        # 创建分析状态
+        # 创建分析状态（耗时使用单调时钟计算）
+        start_perf = time.perf_counter()
         analysis_state = FuturesAnalysisState(
             commodity=commodity,
             analysis_date=analysis_date
@@ -285,35 +472,35 @@ class FuturesAnalysisIntegrator:
         # 确定要运行的模块
         modules_to_run = selected_modules or list(self.supported_modules.keys())
         
-        # 并行运行所有模块
-        tasks = []
-        for module_name in modules_to_run:
-            if module_name in self.supported_modules:
-                task = self.supported_modules[module_name](commodity, analysis_date)
-                tasks.append((module_name, task))
-        
-        # 等待所有任务完成
-        for module_name, task in tasks:
+        async def run_named_module(module_name: str):
             try:
-                result = await task
-                analysis_state.set_module_result(module_name, result)
-                self.logger.info(f"模块 {module_name} 分析完成")
+                return module_name, await self._run_module(module_name, commodity, analysis_date)
             except Exception as e:
-                error_result = ModuleAnalysisResult(
+                return module_name, e
+        
+        # 并行运行所有模块，按完成顺序处理结果
+        module_names = [name for name in modules_to_run if name in self.supported_modules]
+        for next_done in asyncio.as_completed([run_named_module(name) for name in module_names]):
+            module_name, result = await next_done
+            if isinstance(result, Exception):
+                self.logger.error(f"模块 {module_name} 分析失败: {result}")
+                result = ModuleAnalysisResult(
                     module_name=module_name,
                     commodity=commodity,
                     analysis_date=analysis_date,
                     status=AnalysisStatus.FAILED,
-                    error_message=str(e)
+                    error_message=str(result)
                 )
-                analysis_state.set_module_result(module_name, error_result)
-                self.logger.error(f"模块 {module_name} 分析失败: {e}")
+            else:
+                self.logger.info(f"模块 {module_name} 分析完成")
+            
+            analysis_state.set_module_result(module_name, result)
+            if progress_cb:
+                progress_cb(module_name, result)
         
         # 设置完成时间
         analysis_state.completion_time = datetime.now().isoformat()
-        start_time = datetime.fromisoformat(analysis_state.start_time)
-        end_time = datetime.fromisoformat(analysis_state.completion_time)
-        analysis_state.total_execution_time = (end_time - start_time).total_seconds()
+        analysis_state.total_execution_time = time.perf_counter() - start_perf
         
         return analysis_state
     
@@ -325,8 +512,10 @@ class FuturesAnalysisIntegrator:
             # 导入适配器
             from streamlit_inventory_analysis_adapter import analyze_inventory_for_streamlit
             
-            # 调用分析
-            result_data = await analyze_inventory_for_streamlit(commodity, analysis_date, use_reasoner=True)
+            # 调用分析（适配器内部为同步阻塞调用，在工作线程中运行）
+            result_data = await self._run_blocking(
+                _run_coroutine_sync, analyze_inventory_for_streamlit, commodity, analysis_date, use_reasoner=True
+            )
             
             # 计算执行时间
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -372,11 +561,8 @@ class FuturesAnalysisIntegrator:
             from 改进版持仓席位分析适配器 import analyze_improved_positioning_for_streamlit
             
             # 调用分析（同步函数，在线程池中运行以避免阻塞）
-            import asyncio
-            loop = asyncio.get_event_loop()
-            result_data = await loop.run_in_executor(
-                None, 
-                lambda: analyze_improved_positioning_for_streamlit(commodity, analysis_date, use_reasoner=True)
+            result_data = await self._run_blocking(
+                analyze_improved_positioning_for_streamlit, commodity, analysis_date, use_reasoner=True
             )
             
             # 计算执行时间
@@ -422,9 +608,10 @@ class FuturesAnalysisIntegrator:
             # 导入适配器
             from streamlit_ultimate_term_structure_adapter import StreamlitUltimateTermStructureAdapter
             
-            # 调用分析（非异步函数）
-            adapter = StreamlitUltimateTermStructureAdapter()
-            result_data = adapter.analyze_variety_for_streamlit(commodity, analysis_date)
+            # 调用分析（非异步函数，在线程池中运行以避免阻塞）
+            result_data = await self._run_blocking(
+                lambda: StreamlitUltimateTermStructureAdapter().analyze_variety_for_streamlit(commodity, analysis_date)
+            )
             
             # 计算执行时间
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -469,8 +656,10 @@ class FuturesAnalysisIntegrator:
             # 导入适配器
             from streamlit_enhanced_technical_adapter import analyze_technical_for_streamlit
             
-            # 调用分析
-            result_data = await analyze_technical_for_streamlit(commodity, analysis_date)
+            # 调用分析（适配器内部为同步阻塞调用，在工作线程中运行）
+            result_data = await self._run_blocking(
+                _run_coroutine_sync, analyze_technical_for_streamlit, commodity, analysis_date
+            )
             
             # 计算执行时间
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -515,8 +704,10 @@ class FuturesAnalysisIntegrator:
             # 导入适配器
             from streamlit_basis_analysis_adapter import analyze_basis_for_streamlit
             
-            # 调用分析
-            result_data = await analyze_basis_for_streamlit(commodity, analysis_date)
+            # 调用分析（适配器内部为同步阻塞调用，在工作线程中运行）
+            result_data = await self._run_blocking(
+                _run_coroutine_sync, analyze_basis_for_streamlit, commodity, analysis_date
+            )
             
             # 计算执行时间
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -564,8 +755,10 @@ class FuturesAnalysisIntegrator:
             # 获取API密钥
             api_key = config.get("api_settings", {}).get("deepseek", {}).get("api_key", "YOUR_API_KEY")
             
-            # 调用分析
-            result_data = analyze_improved_news_for_streamlit(commodity, api_key, analysis_date)
+            # 调用分析（同步函数，在线程池中运行以避免阻塞）
+            result_data = await self._run_blocking(
+                analyze_improved_news_for_streamlit, commodity, api_key, analysis_date
+            )
             
             # 计算执行时间
             execution_time = (datetime.now() - start_time).total_seconds()
@@ -607,7 +800,7 @@ class FuturesAnalysisIntegrator:
 
         commodity = analysis_state.commodity
         analysis_date = analysis_state.analysis_date
-        start_time = datetime.now()
+        start_perf = time.perf_counter()
 
         self.logger.info(f"开始{commodity}完整分析流程")
 
@@ -615,39 +808,39 @@ class FuturesAnalysisIntegrator:
             # 第1阶段：基础数据分析
             self.logger.info("第1阶段：执行基础数据分析模块")
 
-            # 并行执行基础分析模块
-            tasks = []
-            module_names = ['inventory', 'positioning', 'term_structure', 'technical', 'basis', 'news']
-
-            for module_name in module_names:
-                if hasattr(self, f'_run_{module_name}_analysis'):
-                    task = getattr(self, f'_run_{module_name}_analysis')(commodity, analysis_date)
-                    tasks.append(task)
+            # 并行执行基础分析模块（每个模块单独超时）
+            module_names = []
+            for module_name in ['inventory', 'positioning', 'term_structure', 'technical', 'basis', 'news']:
+                if module_name in self.supported_modules:
+                    module_names.append(module_name)
                 else:
                     self.logger.warning(f"模块 {module_name} 的分析方法不存在")
 
             # 等待所有基础分析完成
-            if tasks:
-                module_results = await asyncio.gather(*tasks, return_exceptions=True)
+            if module_names:
+                module_results = await asyncio.gather(
+                    *(self._run_module(name, commodity, analysis_date) for name in module_names),
+                    return_exceptions=True
+                )
 
                 # 处理结果
-                for i, result in enumerate(module_results):
-                    module_name = module_names[i]
+                for module_name, result in zip(module_names, module_results):
                     if isinstance(result, Exception):
                         self.logger.error(f"{module_name}分析失败: {result}")
-                        setattr(analysis_state, f'{module_name}_analysis', None)
+                        analysis_state.set_module_result(module_name, None)
                     else:
-                        setattr(analysis_state, f'{module_name}_analysis', result)
+                        analysis_state.set_module_result(module_name, result)
 
             # 第2阶段：辩论风控决策
             self.logger.info("第2阶段：执行辩论风控决策分析")
             debate_result = await self.run_optimized_debate_risk_decision(analysis_state)
 
             # 整合最终结果
+            end_iso = datetime.now().isoformat()
             final_result = {
                 "commodity": commodity,
                 "analysis_date": analysis_date,
-                "process_timestamp": datetime.now().isoformat(),
+                "process_timestamp": end_iso,
 
                 # 基础分析结果
                 "inventory_analysis": analysis_state.inventory_analysis,
@@ -664,7 +857,7 @@ class FuturesAnalysisIntegrator:
                 "executive_decision": debate_result.get("executive_decision"),
 
                 # 执行信息
-                "execution_time": (datetime.now() - start_time).total_seconds(),
+                "execution_time": time.perf_counter() - start_perf,
                 "success": True
             }
 
@@ -672,13 +865,14 @@ class FuturesAnalysisIntegrator:
             return final_result
 
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_perf
+            end_iso = datetime.now().isoformat()
             self.logger.error(f"{commodity}完整分析流程失败: {e}")
 
             return {
                 "commodity": commodity,
                 "analysis_date": analysis_date,
-                "process_timestamp": datetime.now().isoformat(),
+                "process_timestamp": end_iso,
                 "success": False,
                 "error": str(e),
                 "execution_time": execution_time
@@ -772,15 +966,20 @@ class FuturesAnalysisIntegrator:
     def convert_numeric_to_text_confidence(self, confidence_value) -> str:
         """将数值信心度转换为文字格式"""
         if isinstance(confidence_value, (int, float)):
-            if confidence_value >= 0.7:
-                return "高"
-            elif confidence_value >= 0.5:
-                return "中"
-            else:
-                return "低"
+            if confidence_value != confidence_value:
+                # NaN与任何阈值比较都为假，bisect会将其归入"高"
+                return CONFIDENCE_LABELS[0]
+            return CONFIDENCE_LABELS[bisect.bisect_right(CONFIDENCE_THRESHOLDS, confidence_value)]
         else:
             return str(confidence_value)  # 如果已经是文字，直接返回
     
+    def convert_numeric_to_text_confidence_batch(self, confidence_values) -> np.ndarray:
+        """批量将数值信心度转换为文字格式（用于多品种×多模块汇总表）"""
+        values = np.asarray(confidence_values, dtype=np.float64)
+        indices = np.digitize(values, CONFIDENCE_THRESHOLDS)
+        indices[np.isnan(values)] = 0  # digitize将NaN归入最高档，这里按"低"处理
+        return np.array(CONFIDENCE_LABELS)[indices]
+    
     def _convert_result_for_streamlit(self, result) -> Dict:
         """将OptimizedTradingAgentsSystem的结果转换为Streamlit界面期望的格式"""
         try:
@@ -833,7 +1032,7 @@ class FuturesAnalysisIntegrator:
                 if position_size_limit <= 0:
                     position_size_limit = 0.03  # 风控最低限制3%
                 position_limit_text = f"{position_size_limit * 100:.1f}%"
-            elif isinstance(position_size_limit, str) and position_size_limit not in ["", "0", "0.0", "待评估"]:
+            elif isinstance(position_size_limit, str) and position_size_limit not in UNSET_POSITION_LIMITS:
                 # 处理字符串型（如"5-8%"）
                 position_limit_text = position_size_limit
             else:
@@ -899,11 +1098,11 @@ class FuturesAnalysisIntegrator:
                 # 🔥 关键修复：如果不是标准格式，不要使用confidence_level进行转换
                 # 因为confidence_level是整体决策信心度，不等于operational_confidence（操作信心度）
                 # operational_confidence应该来自风控评估，必须直接使用，不能被其他值覆盖
-                if operational_confidence not in ['高', '中', '低']:
+                if operational_confidence not in VALID_CONFIDENCE_LEVELS:
                     print(f"⚠️ WARNING [数据转换]: operational_confidence格式异常='{operational_confidence}'，使用默认值'低'")
                     operational_confidence = '低'  # 🔥 修复：默认为保守的"低"
                 
-                if directional_confidence not in ['高', '中', '低']:
+                if directional_confidence not in VALID_CONFIDENCE_LEVELS:
                     print(f"⚠️ WARNING [数据转换]: directional_confidence格式异常='{directional_confidence}'，使用默认值'中'")
                     directional_confidence = '中'
                         
@@ -925,11 +1124,11 @@ class FuturesAnalysisIntegrator:
                 print(f"🐛 DEBUG [数据转换-字典分支]: directional_confidence = {directional_confidence} (type: {type(directional_confidence)})")
                 
                 # 验证格式
-                if operational_confidence not in ['高', '中', '低']:
+                if operational_confidence not in VALID_CONFIDENCE_LEVELS:
                     print(f"⚠️ WARNING [数据转换-字典分支]: operational_confidence格式异常='{operational_confidence}'，使用默认值'低'")
                     operational_confidence = '低'
                 
-                if directional_confidence not in ['高', '中', '低']:
+                if directional_confidence not in VALID_CONFIDENCE_LEVELS:
                     print(f"⚠️ WARNING [数据转换-字典分支]: directional_confidence格式异常='{directional_confidence}'，使用默认值'中'")
                     directional_confidence = '中'
                 
@@ -974,26 +1173,15 @@ class FuturesAnalysisIntegrator:
             
         except Exception as e:
             self.logger.error(f"数据转换失败: {e}")
-            # 返回默认结构
-            return {
-                "success": False,
-                "error": f"数据转换失败: {str(e)}",
-                "commodity": result.get("commodity", "未知"),
-                "analysis_date": result.get("analysis_date", "未知"),
-                "debate_section": {"winner": "未知", "scores": {"bull": 0.0, "bear": 0.0}, "summary": "数据转换失败", "rounds": []},
-                "trading_section": {"strategy_type": "暂停交易", "position_size": "0%", "risk_reward_ratio": "N/A", "time_horizon": "短期", "reasoning": "数据转换失败"},
-                "risk_section": {"overall_risk": "高风险", "position_limit": "0%", "stop_loss": "立即止损", "manager_opinion": "数据转换失败"},
-                "decision_section": {
-                    "final_decision": "持有观望", 
-                    "position_size": "0%", 
-                    "confidence": "0%", 
-                    "rationale": ["数据转换失败"],
-                    "execution_plan": "暂停交易，等待系统恢复",
-                    "monitoring_points": ["系统状态监控"],
-                    "cio_statement": "数据转换失败"
-                },
-                "process_timestamp": datetime.now().isoformat()
-            }
+            # 返回默认结构（深拷贝模板，调用方修改嵌套的字典/列表不会影响模板）
+            failure_result = copy.deepcopy(_CONVERSION_FAILURE_TEMPLATE)
+            failure_result.update(
+                error=f"数据转换失败: {str(e)}",
+                commodity=result.get("commodity", "未知"),
+                analysis_date=result.get("analysis_date", "未知"),
+                process_timestamp=datetime.now().isoformat()
+            )
+            return failure_result
 
 # ============================================================================
 # 5. 测试函数
@@ -1031,6 +1219,13 @@ def test_infrastructure():
     integrator = FuturesAnalysisIntegrator()
     print("✅ 分析整合器创建成功")
     
+    # 测试信心度文字转换（NaN按"低"处理）
+    assert integrator.convert_numeric_to_text_confidence(float('nan')) == '低'
+    assert integrator.convert_numeric_to_text_confidence(0.85) == '高'
+    assert integrator.convert_numeric_to_text_confidence(0.6) == '中'
+    assert list(integrator.convert_numeric_to_text_confidence_batch([float('nan'), 0.3, 0.6, 0.9])) == ['低', '低', '中', '高']
+    print("✅ 信心度转换测试通过")
+    
     print("✅ 基础架构测试完成")
 
 if __name__ == "__main__":
@@ -18,101 +18,121 @@
 创建时间: 2025-01-19
 """
 
+import re
+import sys
 import json
 import asyncio
-import aiohttp
+import atexit
+import httpx
+import importlib.util
 import hashlib
 import pickle
+import random
+import sqlite3
+import threading
 import time
+import weakref
 import functools
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable, Union
+from typing import Dict, List, Optional, Any, Callable, Tuple, Union
 from pathlib import Path
+from types import MappingProxyType
 import pandas as pd
 import numpy as np
 from dataclasses import asdict
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 # ============================================================================
 # 1. DeepSeek API调用封装
 # ============================================================================
 
+# 按事件循环复用的长连接HTTP客户端（连接绑定事件循环，不能跨循环共享）
+_SHARED_HTTP_CLIENTS = weakref.WeakKeyDictionary()
+
+# 仅在安装h2时启用HTTP/2，否则httpx创建客户端会抛出ImportError
+_HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+_DEEPSEEK_TIMEOUT = httpx.Timeout(
+    600,  # 总超时10分钟
+    connect=30,  # 连接超时30秒
+    read=180  # 读取超时180秒（适应复杂分析）
+)
+
+_DEEPSEEK_LIMITS = httpx.Limits(
+    max_connections=100,  # 连接池大小
+    max_keepalive_connections=30,
+    keepalive_expiry=30
+)
+
+def _get_shared_http_client(base_url: str, api_key: str) -> httpx.AsyncClient:
+    """获取当前事件循环下复用的httpx客户端，避免每次请求重新握手"""
+    clients = _SHARED_HTTP_CLIENTS.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get((base_url, api_key))
+    
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=_DEEPSEEK_TIMEOUT,
+            limits=_DEEPSEEK_LIMITS,
+            http2=_HTTP2_AVAILABLE
+        )
+        clients[(base_url, api_key)] = client
+    
+    return client
+
+async def close_shared_http_clients():
+    """关闭当前事件循环下的共享httpx客户端
+
+    共享客户端随事件循环存在；每次分析新建事件循环的调用方须在关闭循环前调用，
+    否则客户端及其连接会泄漏。
+    """
+    clients = _SHARED_HTTP_CLIENTS.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        if not client.is_closed:
+            await client.aclose()
+
 class DeepSeekAPIClient:
     """DeepSeek API客户端封装"""
     
     def __init__(self, api_key: str, base_url: str = "https://api.deepseek.com/v1"):
         self.api_key = api_key
         self.base_url = base_url
-        self.session = None
+        self.client = None
         self.logger = logging.getLogger("DeepSeekAPI")
         
-    async def __aenter__(self):
-        # 增加连接超时和DNS解析超时设置
-        timeout = aiohttp.ClientTimeout(
-            total=600,  # 总超时10分钟（增加）
-            connect=30,  # 连接超时30秒
-            sock_read=180,  # 读取超时180秒（增加到3分钟，适应复杂分析）
-            sock_connect=30  # socket连接超时30秒
-        )
-        
-        # 创建连接器，增加DNS缓存和连接池设置
-        connector = aiohttp.TCPConnector(
-            limit=100,  # 连接池大小
-            limit_per_host=30,  # 每个主机的连接数
-            ttl_dns_cache=300,  # DNS缓存5分钟
-            use_dns_cache=True,
-            keepalive_timeout=30,
-            enable_cleanup_closed=True
-        )
-        
-        self.session = aiohttp.ClientSession(
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            },
-            timeout=timeout,
-            connector=connector
-        )
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
-    
     async def ensure_session(self):
-        """确保session已初始化"""
-        if self.session is None or self.session.closed:
-            # 使用与__aenter__相同的超时和连接器配置
-            timeout = aiohttp.ClientTimeout(
-                total=600,  # 总超时10分钟（增加）
-                connect=30,  # 连接超时30秒
-                sock_read=180,  # 读取超时180秒（增加到3分钟，适应复杂分析）
-                sock_connect=30  # socket连接超时30秒
-            )
-            
-            connector = aiohttp.TCPConnector(
-                limit=100,
-                limit_per_host=30,
-                ttl_dns_cache=300,
-                use_dns_cache=True,
-                keepalive_timeout=30,
-                enable_cleanup_closed=True
-            )
-            
-            self.session = aiohttp.ClientSession(
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                timeout=timeout,
-                connector=connector
-            )
+        """确保客户端已初始化（复用当前事件循环下的长连接）"""
+        if self.client is None or self.client.is_closed:
+            self.client = _get_shared_http_client(self.base_url, self.api_key)
 
     async def close_session(self):
-        """关闭session"""
-        if self.session and not self.session.closed:
-            await self.session.close()
-            self.session = None
+        """关闭共享连接池（仅在进程退出时调用）"""
+        if self.client and not self.client.is_closed:
+            await self.client.aclose()
+        self.client = None
     
     async def __aenter__(self):
         """异步上下文管理器入口"""
@@ -120,20 +140,13 @@ class DeepSeekAPIClient:
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """异步上下文管理器出口"""
-        try:
-            await self.close_session()
-        except Exception as e:
-            # 忽略事件循环关闭时的清理错误
-            if "Event loop is closed" not in str(e):
-                self.logger.warning(f"关闭session时出现异常: {e}")
+        """异步上下文管理器出口（保留连接池供同一事件循环内的后续请求复用，由close_shared_http_clients统一关闭）"""
+        self.client = None
 
     async def chat_completion(self, messages: List[Dict], model: str = "deepseek-chat",
                             temperature: float = 0.1, max_tokens: int = 4000, max_retries: int = 5) -> Dict:
         """聊天补全API调用（带重试机制）"""
 
-        url = f"{self.base_url}/chat/completions"
-
         payload = {
             "model": model,
             "messages": messages,
@@ -148,32 +161,27 @@ class DeepSeekAPIClient:
                 # 确保session已初始化
                 await self.ensure_session()
 
-                # 直接使用session，不使用async with
-                response = await self.session.post(url, json=payload)
+                response = await self.client.post("chat/completions", json=payload)
 
-                try:
-                    if response.status == 200:
-                        result = await response.json()
+                if response.status_code == 200:
+                    result = response.json()
+                    return {
+                        "success": True,
+                        "content": result["choices"][0]["message"]["content"],
+                        "usage": result.get("usage", {}),
+                        "model": model
+                    }
+                else:
+                    error_text = response.text
+                    self.logger.warning(f"API调用失败 (尝试 {attempt+1}/{max_retries}): {response.status_code} - {error_text}")
+
+                    # 如果是最后一次尝试，返回错误
+                    if attempt == max_retries - 1:
                         return {
-                            "success": True,
-                            "content": result["choices"][0]["message"]["content"],
-                            "usage": result.get("usage", {}),
+                            "success": False,
+                            "error": f"HTTP {response.status_code}: {error_text}",
                             "model": model
                         }
-                    else:
-                        error_text = await response.text()
-                        self.logger.warning(f"API调用失败 (尝试 {attempt+1}/{max_retries}): {response.status} - {error_text}")
-
-                        # 如果是最后一次尝试，返回错误
-                        if attempt == max_retries - 1:
-                            return {
-                                "success": False,
-                                "error": f"HTTP {response.status}: {error_text}",
-                                "model": model
-                            }
-
-                finally:
-                    response.close()  # 确保响应被正确关闭
 
                 # 等待后重试，使用指数退避
                 delay = min(2 ** attempt, 30)  # 最大延迟30秒
@@ -184,7 +192,7 @@ class DeepSeekAPIClient:
                 self.logger.warning(f"API调用异常 (尝试 {attempt+1}/{max_retries}): {error_msg}")
                 
                 # 对于DNS或连接问题，给出更详细的错误信息
-                if "DNS" in error_msg or "Timeout" in error_msg or "Cannot connect" in error_msg:
+                if isinstance(e, (httpx.TimeoutException, httpx.ConnectError)):
                     self.logger.warning(f"网络连接问题，将在 {min(2 ** attempt, 30)} 秒后重试...")
 
                 # 如果是最后一次尝试，返回错误
@@ -199,6 +207,19 @@ class DeepSeekAPIClient:
                 delay = min(2 ** attempt, 30)  # 最大延迟30秒
                 await asyncio.sleep(delay)
     
+    async def chat_completion_many(self, message_batches: List[List[Dict]], model: str = "deepseek-chat",
+                                   temperature: float = 0.1, max_tokens: int = 4000,
+                                   concurrency: int = 8) -> List[Dict]:
+        """并发执行多组互不依赖的聊天补全调用（共享连接池，按concurrency限流）"""
+        await self.ensure_session()
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run_one(messages: List[Dict]) -> Dict:
+            async with semaphore:
+                return await self.chat_completion(messages, model, temperature, max_tokens)
+        
+        return await asyncio.gather(*(run_one(messages) for messages in message_batches))
+    
     async def reasoning_completion(self, prompt: str, model: str = "deepseek-reasoner",
                                  temperature: float = 0.1, max_tokens: int = 4000) -> Dict:
         """推理模式API调用"""
@@ -209,17 +230,30 @@ class DeepSeekAPIClient:
         
         return await self.chat_completion(messages, model, temperature, max_tokens)
     
+    @staticmethod
+    def serialize_context(context_data: Dict) -> str:
+        """序列化上下文数据（同一上下文分发给多个分析角色时，预先序列化一次后通过context_str复用）"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(
+                context_data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            ).decode()
+        return json.dumps(context_data, ensure_ascii=False, indent=2)
+    
     async def analyze_with_context(self, system_prompt: str, user_prompt: str,
-                                 context_data: Dict = None, model: str = "deepseek-chat") -> Dict:
-        """带上下文的分析调用"""
+                                 context_data: Dict = None, model: str = "deepseek-chat",
+                                 context_str: str = None) -> Dict:
+        """带上下文的分析调用（context_str为已序列化的上下文，提供时不再重复序列化context_data）"""
         
         messages = [
             {"role": "system", "content": system_prompt}
         ]
         
         # 添加上下文数据
-        if context_data:
-            context_str = json.dumps(context_data, ensure_ascii=False, indent=2)
+        if context_str is None and context_data:
+            context_str = self.serialize_context(context_data)
+        
+        if context_str:
             user_prompt = f"{user_prompt}\n\n## 上下文数据\n```json\n{context_str}\n```"
         
         messages.append({"role": "user", "content": user_prompt})
@@ -230,26 +264,48 @@ class DeepSeekAPIClient:
 # 2. 数据验证和清洗工具
 # ============================================================================
 
+# 商品中文名称到代码的映射（只读）
+_COMMODITY_NAME_MAPPING = MappingProxyType({
+    "螺纹钢": "RB", "热轧卷板": "HC", "铁矿石": "I", "焦炭": "J", "焦煤": "JM",
+    "沪铜": "CU", "沪铝": "AL", "沪锌": "ZN", "沪镍": "NI", "沪锡": "SN",
+    "黄金": "AU", "白银": "AG", "橡胶": "RU", "原油": "SC", "燃油": "FU",
+    "白糖": "SR", "棉花": "CF", "豆粕": "M", "菜粕": "RM", "豆油": "Y"
+})
+
+# 期货商品代码通常是2-3个大写字母
+_COMMODITY_CODE_RE = re.compile(r"^[A-Z]{2,3}\Z")
+_match_commodity_code = _COMMODITY_CODE_RE.match
+
+# 分析结果必需字段
+_REQUIRED_RESULT_FIELDS = ("commodity", "analysis_date", "analysis_type")
+
+# 数值清洗时需要移除的非数字字符（千分位、百分号、单位）；
+# 空白只去掉首尾，中间带空格的值（如"1 234"）仍视为无法解析
+_NUMERIC_JUNK_RE = re.compile(r"[,%元]")
+
+@functools.lru_cache(maxsize=4096)
+def _is_ymd_date(date_str: str) -> bool:
+    """判断是否为YYYY-MM-DD格式日期（结果缓存，同一日期常被反复校验）"""
+    try:
+        datetime.strptime(date_str, "%Y-%m-%d")
+        return True
+    except ValueError:
+        return False
+
 class DataValidator:
     """数据验证器"""
     
+    __slots__ = ()
+    
     @staticmethod
     def validate_commodity_code(commodity: str) -> bool:
         """验证商品代码格式"""
-        if not isinstance(commodity, str):
-            return False
-        
-        # 期货商品代码通常是2-3个大写字母
-        return len(commodity) in [2, 3] and commodity.isupper() and commodity.isalpha()
+        return isinstance(commodity, str) and _match_commodity_code(commodity) is not None
     
     @staticmethod
     def validate_date_format(date_str: str) -> bool:
         """验证日期格式 YYYY-MM-DD"""
-        try:
-            datetime.strptime(date_str, "%Y-%m-%d")
-            return True
-        except ValueError:
-            return False
+        return _is_ymd_date(date_str)
     
     @staticmethod
     def validate_analysis_result(result: Dict) -> Dict:
@@ -262,8 +318,7 @@ class DataValidator:
         }
         
         # 检查必需字段
-        required_fields = ["commodity", "analysis_date", "analysis_type"]
-        for field in required_fields:
+        for field in _REQUIRED_RESULT_FIELDS:
             if field not in result:
                 validation_result["errors"].append(f"缺少必需字段: {field}")
                 validation_result["is_valid"] = False
@@ -293,7 +348,7 @@ class DataValidator:
         
         if isinstance(data, str):
             # 移除常见的非数字字符
-            cleaned = data.replace(",", "").replace("%", "").replace("元", "").strip()
+            cleaned = _NUMERIC_JUNK_RE.sub("", data).strip()
             try:
                 return float(cleaned)
             except ValueError:
@@ -301,17 +356,19 @@ class DataValidator:
         
         return None
     
+    @staticmethod
+    def clean_numeric_series(series: pd.Series) -> pd.Series:
+        """批量清洗数值列（无法解析的值返回NaN）"""
+        if pd.api.types.is_numeric_dtype(series):
+            return series.astype(float)
+        
+        cleaned = series.astype(str).str.replace(_NUMERIC_JUNK_RE, "", regex=True).str.strip()
+        return pd.to_numeric(cleaned, errors="coerce")
+    
     @staticmethod
     def normalize_commodity_name(name: str) -> str:
         """标准化商品名称"""
-        name_mapping = {
-            "螺纹钢": "RB", "热轧卷板": "HC", "铁矿石": "I", "焦炭": "J", "焦煤": "JM",
-            "沪铜": "CU", "沪铝": "AL", "沪锌": "ZN", "沪镍": "NI", "沪锡": "SN",
-            "黄金": "AU", "白银": "AG", "橡胶": "RU", "原油": "SC", "燃油": "FU",
-            "白糖": "SR", "棉花": "CF", "豆粕": "M", "菜粕": "RM", "豆油": "Y"
-        }
-        
-        return name_mapping.get(name, name.upper())
+        return _COMMODITY_NAME_MAPPING.get(name) or name.upper()
 
 # ============================================================================
 # 3. 文件操作工具
@@ -320,6 +377,8 @@ class DataValidator:
 class FileManager:
     """文件管理器"""
     
+    __slots__ = ("base_dir", "logger")
+    
     def __init__(self, base_dir: str):
         self.base_dir = Path(base_dir)
         self.logger = logging.getLogger("FileManager")
@@ -331,8 +390,11 @@ class FileManager:
         return dir_path
     
     def save_json(self, data: Any, file_path: Union[str, Path], 
-                  ensure_dir: bool = True) -> bool:
-        """保存JSON数据"""
+                  ensure_dir: bool = True, pretty: bool = True) -> bool:
+        """保存JSON数据（默认缩进格式；pretty=False时写紧凑格式，体积更小）
+
+        json.dump按片段边编码边写入文件，不在内存中构建完整的JSON字符串。
+        """
         try:
             file_path = Path(file_path)
             
@@ -340,29 +402,78 @@ class FileManager:
                 file_path.parent.mkdir(parents=True, exist_ok=True)
             
             with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2, default=str)
-            
+                if pretty:
+                    json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+                else:
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"), default=str)
             return True
             
         except Exception as e:
             self.logger.error(f"保存JSON文件失败: {e}")
             return False
     
+    def save_json_many(self, items: List[Tuple[Union[str, Path], Any]],
+                       ensure_dir: bool = True, pretty: bool = True) -> int:
+        """批量保存JSON文件（逐个调用save_json，每个目录只创建一次），返回成功数量"""
+        saved_count = 0
+        created_dirs = set()
+        
+        for file_path, data in items:
+            file_path = Path(file_path)
+            
+            if ensure_dir and file_path.parent not in created_dirs:
+                try:
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                except OSError as e:
+                    self.logger.error(f"保存JSON文件失败 {file_path}: {e}")
+                    continue
+                created_dirs.add(file_path.parent)
+            
+            if self.save_json(data, file_path, ensure_dir=False, pretty=pretty):
+                saved_count += 1
+        
+        return saved_count
+    
     def load_json(self, file_path: Union[str, Path]) -> Optional[Dict]:
         """加载JSON数据"""
         try:
-            file_path = Path(file_path)
+            content = Path(file_path).read_bytes()
             
-            if not file_path.exists():
-                return None
+            if ORJSON_AVAILABLE:
+                try:
+                    return orjson.loads(content)
+                except orjson.JSONDecodeError:
+                    # orjson不接受标准库json写出的NaN/Infinity，回退到标准库解析
+                    pass
+            return json.loads(content)
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-                
+        except FileNotFoundError:
+            return None
         except Exception as e:
             self.logger.error(f"加载JSON文件失败: {e}")
             return None
     
+    async def save_json_async(self, data: Any, file_path: Union[str, Path],
+                              ensure_dir: bool = True, pretty: bool = True) -> bool:
+        """在线程池中整体执行save_json，避免阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.save_json, data, file_path, ensure_dir, pretty)
+        )
+    
+    async def save_json_many_async(self, items: List[Tuple[Union[str, Path], Any]],
+                                   ensure_dir: bool = True, pretty: bool = True) -> int:
+        """在线程池中执行save_json_many，整批写入只占用一次线程调度"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.save_json_many, items, ensure_dir, pretty)
+        )
+    
+    async def load_json_async(self, file_path: Union[str, Path]) -> Optional[Dict]:
+        """在线程池中整体执行load_json，避免阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.load_json, file_path)
+    
     def save_dataframe(self, df: pd.DataFrame, file_path: Union[str, Path],
                       format: str = "csv") -> bool:
         """保存DataFrame"""
@@ -373,9 +484,19 @@ class FileManager:
             if format.lower() == "csv":
                 df.to_csv(file_path, index=False, encoding='utf-8-sig')
             elif format.lower() == "excel":
-                df.to_excel(file_path, index=False)
+                # 流式写入，避免构建整个工作簿的单元格对象
+                from openpyxl import Workbook
+                workbook = Workbook(write_only=True)
+                worksheet = workbook.create_sheet()
+                worksheet.append([str(column) for column in df.columns])
+                for row in df.itertuples(index=False, name=None):
+                    worksheet.append([None if pd.api.types.is_scalar(value) and pd.isna(value) else value
+                                      for value in row])
+                workbook.save(file_path)
             elif format.lower() == "parquet":
-                df.to_parquet(file_path, index=False)
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                pq.write_table(pa.Table.from_pandas(df, preserve_index=False), file_path, compression="zstd")
             else:
                 raise ValueError(f"不支持的格式: {format}")
             
@@ -389,21 +510,20 @@ class FileManager:
         """加载DataFrame"""
         try:
             file_path = Path(file_path)
-            
-            if not file_path.exists():
-                return None
-            
             suffix = file_path.suffix.lower()
             
             if suffix == ".csv":
                 return pd.read_csv(file_path, encoding='utf-8-sig')
-            elif suffix in [".xlsx", ".xls"]:
+            elif suffix in (".xlsx", ".xls"):
                 return pd.read_excel(file_path)
             elif suffix == ".parquet":
-                return pd.read_parquet(file_path)
+                import pyarrow.parquet as pq
+                return pq.read_table(file_path).to_pandas()
             else:
                 raise ValueError(f"不支持的文件格式: {suffix}")
                 
+        except FileNotFoundError:
+            return None
         except Exception as e:
             self.logger.error(f"加载DataFrame失败: {e}")
             return None
@@ -432,39 +552,112 @@ class FileManager:
 # 4. 缓存管理
 # ============================================================================
 
+# zstd帧头魔数，用于识别压缩过的缓存数据（未压缩的pickle数据以0x80开头）
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def _is_fresher(new_data: Any, cached_data: Any) -> bool:
+    """比较两份缓存数据的timestamp，无法比较时视为更新"""
+    try:
+        return new_data["timestamp"] > cached_data["timestamp"]
+    except (KeyError, TypeError, IndexError):
+        return True
+
+# 尚未关闭的缓存管理器，进程退出时统一将内存中的写入刷到磁盘
+_OPEN_CACHE_MANAGERS = weakref.WeakSet()
+
+@atexit.register
+def _flush_open_cache_managers():
+    for cache_manager in list(_OPEN_CACHE_MANAGERS):
+        cache_manager.flush()
+
 class CacheManager:
-    """缓存管理器"""
+    """缓存管理器（进程内LRU内存层 + 单个SQLite WAL数据库，写入延迟批量落盘）"""
     
-    def __init__(self, cache_dir: str, expire_hours: int = 24):
+    # __weakref__用于登记到_OPEN_CACHE_MANAGERS
+    __slots__ = ("cache_dir", "expire_hours", "max_memory_entries", "logger", "_lock", "_conn",
+                 "_compressor", "_decompressor", "_mem", "_dirty", "__weakref__")
+    
+    def __init__(self, cache_dir: str, expire_hours: int = 24, max_memory_entries: int = 1024):
         self.cache_dir = Path(cache_dir)
         self.expire_hours = expire_hours
+        self.max_memory_entries = max_memory_entries
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logging.getLogger("CacheManager")
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_dir / "cache.db"),
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key BLOB PRIMARY KEY, expire_time REAL NOT NULL, created_time REAL NOT NULL, data BLOB NOT NULL)"
+        )
+        
+        # 压缩器非线程安全，仅在持有锁时使用
+        if ZSTD_AVAILABLE:
+            self._compressor = zstandard.ZstdCompressor(level=3)
+            self._decompressor = zstandard.ZstdDecompressor()
+        
+        # 内存层（LRU）：哈希键 -> (单调时钟过期时间, 墙钟过期时间, 创建时间, 序列化数据)
+        # 保存序列化后的字节而非对象本身，调用方修改传入或取出的对象不会影响缓存
+        self._mem: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._dirty = set()
+        _OPEN_CACHE_MANAGERS.add(self)
+    
+    def _compress_payload(self, raw: bytes) -> bytes:
+        """压缩序列化数据（落盘时调用）"""
+        if ZSTD_AVAILABLE:
+            return self._compressor.compress(raw)
+        return raw
+    
+    def _decompress_payload(self, payload: bytes) -> bytes:
+        """解压磁盘上的缓存数据，返回序列化字节"""
+        if payload[:4] == _ZSTD_MAGIC:
+            return self._decompressor.decompress(payload)
+        return payload
     
-    def _get_cache_key(self, key: str) -> str:
-        """生成缓存键的哈希值"""
-        return hashlib.md5(key.encode()).hexdigest()
+    def _remember(self, cache_key: bytes, entry: tuple):
+        """写入内存层并按LRU淘汰超出上限的条目（须持有锁）"""
+        self._mem[cache_key] = entry
+        self._mem.move_to_end(cache_key)
+        
+        while len(self._mem) > self.max_memory_entries:
+            evicted_key, (_, expire_time, created_time, raw) = self._mem.popitem(last=False)
+            if evicted_key in self._dirty:
+                # 尚未落盘的条目被淘汰前先写入数据库
+                self._dirty.discard(evicted_key)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, expire_time, created_time, data) VALUES (?, ?, ?, ?)",
+                    (evicted_key, expire_time, created_time, self._compress_payload(raw))
+                )
     
-    def _get_cache_path(self, key: str) -> Path:
-        """获取缓存文件路径"""
-        cache_key = self._get_cache_key(key)
-        return self.cache_dir / f"{cache_key}.cache"
+    def _get_cache_key(self, key: str) -> bytes:
+        """生成缓存键的哈希值（非加密哈希即可）"""
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh3_64_digest(key)
+        return hashlib.blake2b(key.encode(), digest_size=8).digest()
     
-    def set(self, key: str, data: Any, expire_hours: Optional[int] = None) -> bool:
-        """设置缓存"""
+    def set(self, key: str, data: Any, expire_hours: Optional[int] = None,
+            conditional: bool = False) -> bool:
+        """设置缓存（先写入内存，调用flush或close时批量落盘）
+        
+        conditional=True时，仅当新数据的timestamp晚于已缓存数据时才覆盖
+        """
         try:
-            cache_path = self._get_cache_path(key)
-            expire_time = datetime.now() + timedelta(hours=expire_hours or self.expire_hours)
+            if conditional:
+                cached_data = self.get(key)
+                if cached_data is not None and not _is_fresher(data, cached_data):
+                    return True
             
-            cache_data = {
-                "data": data,
-                "expire_time": expire_time,
-                "created_time": datetime.now(),
-                "key": key
-            }
+            ttl = (expire_hours or self.expire_hours) * 3600
+            now = time.time()
+            cache_key = self._get_cache_key(key)
+            raw = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
             
-            with open(cache_path, 'wb') as f:
-                pickle.dump(cache_data, f)
+            with self._lock:
+                self._remember(cache_key, (time.monotonic() + ttl, now + ttl, now, raw))
+                self._dirty.add(cache_key)
             
             return True
             
@@ -475,20 +668,35 @@ class CacheManager:
     def get(self, key: str) -> Optional[Any]:
         """获取缓存"""
         try:
-            cache_path = self._get_cache_path(key)
-            
-            if not cache_path.exists():
-                return None
-            
-            with open(cache_path, 'rb') as f:
-                cache_data = pickle.load(f)
+            cache_key = self._get_cache_key(key)
             
-            # 检查是否过期
-            if datetime.now() > cache_data["expire_time"]:
-                cache_path.unlink()  # 删除过期缓存
-                return None
-            
-            return cache_data["data"]
+            with self._lock:
+                entry = self._mem.get(cache_key)
+                if entry is not None:
+                    if entry[0] >= time.monotonic():
+                        self._mem.move_to_end(cache_key)
+                        return pickle.loads(entry[3])
+                    # 内存中已过期：丢弃未落盘的写入，并清理磁盘上的旧条目
+                    del self._mem[cache_key]
+                    self._dirty.discard(cache_key)
+                
+                now = time.time()
+                # 过期判断在查询条件中完成，过期条目不会读取数据内容
+                row = self._conn.execute(
+                    "SELECT expire_time, created_time, data FROM cache WHERE key = ? AND expire_time >= ?",
+                    (cache_key, now)
+                ).fetchone()
+                
+                if row is None:
+                    self._conn.execute(
+                        "DELETE FROM cache WHERE key = ? AND expire_time < ?", (cache_key, now)
+                    )  # 删除过期缓存
+                    return None
+                
+                expire_time, created_time, payload = row
+                raw = self._decompress_payload(payload)
+                self._remember(cache_key, (time.monotonic() + (expire_time - now), expire_time, created_time, raw))
+                return pickle.loads(raw)
             
         except Exception as e:
             self.logger.error(f"获取缓存失败: {e}")
@@ -501,9 +709,11 @@ class CacheManager:
     def delete(self, key: str) -> bool:
         """删除缓存"""
         try:
-            cache_path = self._get_cache_path(key)
-            if cache_path.exists():
-                cache_path.unlink()
+            cache_key = self._get_cache_key(key)
+            with self._lock:
+                self._mem.pop(cache_key, None)
+                self._dirty.discard(cache_key)
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (cache_key,))
             return True
         except Exception as e:
             self.logger.error(f"删除缓存失败: {e}")
@@ -511,68 +721,125 @@ class CacheManager:
     
     def clear_expired(self) -> int:
         """清理过期缓存"""
-        cleared_count = 0
-        
-        for cache_file in self.cache_dir.glob("*.cache"):
-            try:
-                with open(cache_file, 'rb') as f:
-                    cache_data = pickle.load(f)
-                
-                if datetime.now() > cache_data["expire_time"]:
-                    cache_file.unlink()
-                    cleared_count += 1
-                    
-            except Exception as e:
-                # 无法读取的缓存文件也删除
-                cache_file.unlink()
-                cleared_count += 1
+        with self._lock:
+            now = time.monotonic()
+            expired_keys = [k for k, entry in self._mem.items() if entry[0] < now]
+            for cache_key in expired_keys:
+                del self._mem[cache_key]
+                self._dirty.discard(cache_key)
+            
+            cleared_count = self._conn.execute(
+                "DELETE FROM cache WHERE expire_time < ?", (time.time(),)
+            ).rowcount
         
-        self.logger.info(f"清理了 {cleared_count} 个过期缓存文件")
+        self.logger.info(f"清理了 {cleared_count} 个过期缓存")
         return cleared_count
+    
+    def flush(self) -> int:
+        """将内存中尚未落盘的缓存在单个事务中写入数据库"""
+        try:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                
+                rows = []
+                for cache_key in self._dirty:
+                    _, expire_time, created_time, raw = self._mem[cache_key]
+                    rows.append((cache_key, expire_time, created_time, self._compress_payload(raw)))
+                
+                # 连接处于自动提交模式，显式开启事务以便一次提交全部写入
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO cache (key, expire_time, created_time, data) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._dirty.clear()
+            
+            return len(rows)
+            
+        except Exception as e:
+            self.logger.error(f"缓存落盘失败: {e}")
+            return 0
+    
+    def close(self):
+        """落盘并关闭缓存数据库"""
+        self.flush()
+        _OPEN_CACHE_MANAGERS.discard(self)
+        with self._lock:
+            self._conn.close()
 
 # ============================================================================
 # 5. 错误处理装饰器
 # ============================================================================
 
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+    """从异常携带的HTTP响应中读取Retry-After（秒）"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
 def retry_on_failure(max_retries: int = 3, delay: float = 1.0, 
-                    backoff: float = 2.0, exceptions: tuple = (Exception,)):
-    """重试装饰器"""
+                    backoff: float = 2.0, exceptions: tuple = (Exception,),
+                    max_delay: float = 30.0):
+    """重试装饰器（指数退避 + 随机抖动，优先遵循服务端Retry-After）"""
+    # 预先计算退避时间表，抖动范围为0.5~1.5倍，避免并发任务同时重试
+    schedule = tuple(min(delay * (backoff ** i), max_delay) for i in range(max_retries))
+    
     def decorator(func: Callable) -> Callable:
+        log = logging.getLogger(func.__module__)
+        
+        def next_wait_time(attempt: int, exc: Exception) -> float:
+            retry_after = _retry_after_seconds(exc)
+            if retry_after is not None:
+                return min(retry_after, max_delay)
+            return schedule[attempt] * (0.5 + random.random())
+        
+        def log_failure(attempt: int, exc: Exception, wait_time: float):
+            if log.isEnabledFor(logging.WARNING):
+                log.warning("函数 %s 第 %d 次尝试失败: %s，%.1f秒后重试", func.__name__, attempt + 1, exc, wait_time)
+        
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
-            last_exception = None
-            
-            for attempt in range(max_retries + 1):
+            for attempt in range(max_retries):
                 try:
                     return await func(*args, **kwargs)
                 except exceptions as e:
-                    last_exception = e
-                    if attempt < max_retries:
-                        wait_time = delay * (backoff ** attempt)
-                        logging.warning(f"函数 {func.__name__} 第 {attempt + 1} 次尝试失败: {e}，{wait_time:.1f}秒后重试")
-                        await asyncio.sleep(wait_time)
-                    else:
-                        logging.error(f"函数 {func.__name__} 在 {max_retries + 1} 次尝试后仍然失败")
+                    wait_time = next_wait_time(attempt, e)
+                    log_failure(attempt, e, wait_time)
+                    await asyncio.sleep(wait_time)
             
-            raise last_exception
+            try:
+                return await func(*args, **kwargs)
+            except exceptions:
+                log.error("函数 %s 在 %d 次尝试后仍然失败", func.__name__, max_retries + 1)
+                raise
         
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            last_exception = None
-            
-            for attempt in range(max_retries + 1):
+            for attempt in range(max_retries):
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    last_exception = e
-                    if attempt < max_retries:
-                        wait_time = delay * (backoff ** attempt)
-                        logging.warning(f"函数 {func.__name__} 第 {attempt + 1} 次尝试失败: {e}，{wait_time:.1f}秒后重试")
-                        time.sleep(wait_time)
-                    else:
-                        logging.error(f"函数 {func.__name__} 在 {max_retries + 1} 次尝试后仍然失败")
+                    wait_time = next_wait_time(attempt, e)
+                    log_failure(attempt, e, wait_time)
+                    time.sleep(wait_time)
             
-            raise last_exception
+            try:
+                return func(*args, **kwargs)
+            except exceptions:
+                log.error("函数 %s 在 %d 次尝试后仍然失败", func.__name__, max_retries + 1)
+                raise
         
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
     
@@ -583,30 +850,27 @@ def log_execution_time(logger: Optional[logging.Logger] = None):
     def decorator(func: Callable) -> Callable:
         log = logger or logging.getLogger(func.__module__)
         
+        # 使用单调时钟计时，日志参数延迟格式化（日志级别关闭时不产生格式化开销）
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             try:
                 result = await func(*args, **kwargs)
-                execution_time = time.time() - start_time
-                log.info(f"函数 {func.__name__} 执行完成，耗时: {execution_time:.2f}秒")
+                log.info("函数 %s 执行完成，耗时: %.2f秒", func.__name__, (time.perf_counter_ns() - start_ns) / 1e9)
                 return result
             except Exception as e:
-                execution_time = time.time() - start_time
-                log.error(f"函数 {func.__name__} 执行失败，耗时: {execution_time:.2f}秒，错误: {e}")
+                log.error("函数 %s 执行失败，耗时: %.2f秒，错误: %s", func.__name__, (time.perf_counter_ns() - start_ns) / 1e9, e)
                 raise
         
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             try:
                 result = func(*args, **kwargs)
-                execution_time = time.time() - start_time
-                log.info(f"函数 {func.__name__} 执行完成，耗时: {execution_time:.2f}秒")
+                log.info("函数 %s 执行完成，耗时: %.2f秒", func.__name__, (time.perf_counter_ns() - start_ns) / 1e9)
                 return result
             except Exception as e:
-                execution_time = time.time() - start_time
-                log.error(f"函数 {func.__name__} 执行失败，耗时: {execution_time:.2f}秒，错误: {e}")
+                log.error("函数 %s 执行失败，耗时: %.2f秒，错误: %s", func.__name__, (time.perf_counter_ns() - start_ns) / 1e9, e)
                 raise
         
         return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
@@ -617,64 +881,86 @@ def log_execution_time(logger: Optional[logging.Logger] = None):
 # 6. 时间处理工具
 # ============================================================================
 
+_DEFAULT_DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%Y.%m.%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S"
+)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_with_formats(date_str: str, formats: tuple) -> Optional[datetime]:
+    """按格式依次尝试解析日期字符串（结果缓存）"""
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    
+    return None
+
+@functools.lru_cache(maxsize=1)
+def _datetime_at_second(epoch_second: int) -> datetime:
+    return datetime.fromtimestamp(epoch_second)
+
+def _current_second() -> datetime:
+    """当前时间（精确到秒，同一秒内复用同一个datetime对象）"""
+    return _datetime_at_second(int(time.time()))
+
+# 预先生成的工作日日历（周一到周五，已排序），常见区间查询只需两次二分查找
+_TRADING_CALENDAR_START = np.datetime64("2000-01-01", "D")
+_TRADING_CALENDAR_END = np.datetime64("2050-12-31", "D")
+_TRADING_DAYS = np.arange(_TRADING_CALENDAR_START, _TRADING_CALENDAR_END + 1, dtype="datetime64[D]")
+_TRADING_DAYS = _TRADING_DAYS[np.is_busday(_TRADING_DAYS)]
+
 class TimeUtils:
     """时间处理工具类"""
     
+    __slots__ = ()
+    
     @staticmethod
     def get_trading_days(start_date: str, end_date: str, 
-                        exclude_weekends: bool = True) -> List[str]:
-        """获取交易日列表"""
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        end = datetime.strptime(end_date, "%Y-%m-%d")
+                        exclude_weekends: bool = True,
+                        holidays: Optional[List[str]] = None) -> List[str]:
+        """获取交易日列表（holidays为需要额外排除的节假日）"""
+        start = np.datetime64(datetime.strptime(start_date, "%Y-%m-%d").date(), "D")
+        end = np.datetime64(datetime.strptime(end_date, "%Y-%m-%d").date(), "D")
+        
+        if exclude_weekends and not holidays and _TRADING_CALENDAR_START <= start and end <= _TRADING_CALENDAR_END:
+            lo = np.searchsorted(_TRADING_DAYS, start)
+            hi = np.searchsorted(_TRADING_DAYS, end, side="right")
+            return _TRADING_DAYS[lo:hi].astype(str).tolist()
         
-        trading_days = []
-        current = start
+        days = np.arange(start, end + np.timedelta64(1, "D"), dtype="datetime64[D]")
         
-        while current <= end:
-            if not exclude_weekends or current.weekday() < 5:  # 周一到周五
-                trading_days.append(current.strftime("%Y-%m-%d"))
-            current += timedelta(days=1)
+        if exclude_weekends:  # 周一到周五
+            days = days[np.is_busday(days, holidays=holidays or [])]
+        elif holidays:
+            days = days[~np.isin(days, np.array(holidays, dtype="datetime64[D]"))]
         
-        return trading_days
+        return days.astype(str).tolist()
     
     @staticmethod
     def get_recent_trading_day(offset_days: int = 0) -> str:
         """获取最近的交易日"""
-        current = datetime.now() - timedelta(days=offset_days)
+        current = np.datetime64((datetime.now() - timedelta(days=offset_days)).date(), "D")
         
         # 如果是周末，回退到周五
-        while current.weekday() >= 5:
-            current -= timedelta(days=1)
-        
-        return current.strftime("%Y-%m-%d")
+        return str(np.busday_offset(current, 0, roll="backward"))
     
     @staticmethod
     def format_timestamp(timestamp: Optional[datetime] = None, 
                         format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
         """格式化时间戳"""
         if timestamp is None:
-            timestamp = datetime.now()
+            timestamp = datetime.now() if "%f" in format_str else _current_second()
         return timestamp.strftime(format_str)
     
     @staticmethod
     def parse_date_string(date_str: str, formats: List[str] = None) -> Optional[datetime]:
         """解析日期字符串"""
-        if formats is None:
-            formats = [
-                "%Y-%m-%d",
-                "%Y/%m/%d", 
-                "%Y.%m.%d",
-                "%Y-%m-%d %H:%M:%S",
-                "%Y/%m/%d %H:%M:%S"
-            ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        
-        return None
+        return _parse_date_with_formats(date_str, _DEFAULT_DATE_FORMATS if formats is None else tuple(formats))
 
 # ============================================================================
 # 7. 数据格式转换工具
@@ -683,6 +969,8 @@ class TimeUtils:
 class DataConverter:
     """数据格式转换工具"""
     
+    __slots__ = ()
+    
     @staticmethod
     def dict_to_dataframe(data_dict: Dict, orient: str = "records") -> pd.DataFrame:
         """字典转DataFrame"""
@@ -711,17 +999,28 @@ class DataConverter:
     @staticmethod
     def flatten_dict(nested_dict: Dict, separator: str = ".") -> Dict:
         """扁平化嵌套字典"""
-        def _flatten(obj, parent_key=""):
-            items = []
+        flat_dict = {}
+        # 迭代展开（逆序入栈以保持原有键顺序），直接写入同一个结果字典
+        stack = [("", nested_dict)]
+        
+        while stack:
+            prefix, obj = stack.pop()
             if isinstance(obj, dict):
-                for key, value in obj.items():
-                    new_key = f"{parent_key}{separator}{key}" if parent_key else key
-                    items.extend(_flatten(value, new_key).items())
+                stack.extend(
+                    (f"{prefix}{separator}{key}" if prefix else key, value)
+                    for key, value in reversed(obj.items())
+                )
             else:
-                return {parent_key: obj}
-            return dict(items)
+                flat_dict[prefix] = obj
         
-        return _flatten(nested_dict)
+        return flat_dict
+    
+    @staticmethod
+    def flatten_numeric_dict(nested_dict: Dict, separator: str = ".") -> Tuple[List[str], np.ndarray]:
+        """扁平化叶子均为数值的嵌套字典，返回(键列表, float64数组)，便于交给numpy/numba批量计算"""
+        flat_dict = DataConverter.flatten_dict(nested_dict, separator)
+        values = np.fromiter(flat_dict.values(), dtype=np.float64, count=len(flat_dict))
+        return list(flat_dict), values
     
     @staticmethod
     def unflatten_dict(flat_dict: Dict, separator: str = ".") -> Dict:
@@ -748,56 +1047,70 @@ class DataConverter:
 async def test_tools():
     """测试工具模块功能"""
     
-    print("🔧 测试期货Trading Agents工具模块...")
+    # 输出先收集到列表，最后一次性写入stdout
+    lines = ["🔧 测试期货Trading Agents工具模块..."]
     
     # 1. 测试数据验证器
-    print("\n1. 测试数据验证器...")
+    lines.append("\n1. 测试数据验证器...")
     validator = DataValidator()
     
-    print(f"   商品代码验证 'RB': {validator.validate_commodity_code('RB')}")
-    print(f"   商品代码验证 'invalid': {validator.validate_commodity_code('invalid')}")
-    print(f"   日期格式验证 '2025-01-19': {validator.validate_date_format('2025-01-19')}")
+    lines.append(f"   商品代码验证 'RB': {validator.validate_commodity_code('RB')}")
+    lines.append(f"   商品代码验证 'invalid': {validator.validate_commodity_code('invalid')}")
+    lines.append(f"   日期格式验证 '2025-01-19': {validator.validate_date_format('2025-01-19')}")
     
     # 2. 测试文件管理器
-    print("\n2. 测试文件管理器...")
+    lines.append("\n2. 测试文件管理器...")
     file_manager = FileManager("./test_data")
     
-    test_data = {"test": "data", "timestamp": datetime.now()}
-    success = file_manager.save_json(test_data, "./test_data/test.json")
-    print(f"   JSON保存: {success}")
+    test_data = {"test": "data", "timestamp": time.time()}
+    success = await file_manager.save_json_async(test_data, "./test_data/test.json")
+    lines.append(f"   JSON保存: {success}")
     
-    loaded_data = file_manager.load_json("./test_data/test.json")
-    print(f"   JSON加载: {loaded_data is not None}")
+    loaded_data = await file_manager.load_json_async("./test_data/test.json")
+    lines.append(f"   JSON加载: {loaded_data is not None}")
+    
+    batch_items = [(f"./test_data/batch_{i}.json", {"index": i, **test_data}) for i in range(3)]
+    batch_saved = await file_manager.save_json_many_async(batch_items)
+    lines.append(f"   JSON批量保存: {batch_saved}/{len(batch_items)}")
     
     # 3. 测试缓存管理器
-    print("\n3. 测试缓存管理器...")
+    lines.append("\n3. 测试缓存管理器...")
     cache = CacheManager("./test_cache")
     
     cache.set("test_key", {"cached": "data"}, expire_hours=1)
     cached_data = cache.get("test_key")
-    print(f"   缓存设置和获取: {cached_data is not None}")
+    lines.append(f"   缓存设置和获取: {cached_data is not None}")
     
     # 4. 测试时间工具
-    print("\n4. 测试时间工具...")
+    lines.append("\n4. 测试时间工具...")
     time_utils = TimeUtils()
     
     recent_day = time_utils.get_recent_trading_day()
     trading_days = time_utils.get_trading_days("2025-01-15", "2025-01-19")
-    print(f"   最近交易日: {recent_day}")
-    print(f"   交易日列表: {trading_days}")
+    lines.append(f"   最近交易日: {recent_day}")
+    lines.append(f"   交易日列表: {trading_days}")
     
     # 5. 测试数据转换器
-    print("\n5. 测试数据转换器...")
+    lines.append("\n5. 测试数据转换器...")
     converter = DataConverter()
     
     test_dict = {"a": {"b": {"c": 1}}, "d": 2}
     flat_dict = converter.flatten_dict(test_dict)
+    assert flat_dict == {"a.b.c": 1, "d": 2}, flat_dict
     unflat_dict = converter.unflatten_dict(flat_dict)
-    print(f"   字典扁平化: {flat_dict}")
-    print(f"   字典反扁平化: {unflat_dict}")
+    assert unflat_dict == test_dict, unflat_dict
+    lines.append(f"   字典扁平化: {flat_dict}")
+    lines.append(f"   字典反扁平化: {unflat_dict}")
     
-    print("\n✅ 工具模块测试完成！")
+    lines.append("\n✅ 工具模块测试完成！")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 if __name__ == "__main__":
-    # 运行测试
-    asyncio.run(test_tools())
+    # 运行测试（有uvloop时使用uvloop事件循环，仅影响其中的异步文件测试；Windows等环境回退到asyncio.run）
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    
+    run(test_tools())
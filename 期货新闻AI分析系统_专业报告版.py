@@ -15,33 +15,238 @@ import os
 import sys
 import subprocess
 import importlib
+import importlib.util
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from dataclasses import dataclass, field
+from functools import lru_cache
+from heapq import nlargest
+from operator import itemgetter
 from datetime import datetime, timedelta
+from types import MappingProxyType
+from urllib.parse import urlsplit
 import json
 import warnings
-import requests
-from bs4 import BeautifulSoup
-import feedparser
 import re
 from typing import List, Dict, Optional
 import time
 
+# 可选：HTTP响应磁盘缓存，重复分析同一品种时直接命中缓存
+# （只探测是否安装，真正导入推迟到创建分析器时，菜单/--help不为requests付出导入开销）
+REQUESTS_CACHE_AVAILABLE = importlib.util.find_spec('requests_cache') is not None
+
+# 可选：Aho-Corasick多模式匹配，一次扫描文本即可找出全部关键词
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# 可选：C++实现的模糊匹配，用于品种名称输错时给出建议
+try:
+    from rapidfuzz import fuzz, process as fuzz_process, utils as fuzz_utils
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# 可选：orjson加速API请求体序列化和响应解析
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 可选：MurmurHash3，将标题压缩为64位整数指纹用于去重
+try:
+    import mmh3
+    MMH3_AVAILABLE = True
+except ImportError:
+    MMH3_AVAILABLE = False
+
 warnings.filterwarnings('ignore')
 
+# 网页爬取时最多读取的字节数（只需页面前部的链接）
+MAX_SCRAPE_BYTES = 256 * 1024
+
+def json_dumps_bytes(obj):
+    """序列化为UTF-8 JSON字节串（有orjson时使用orjson）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def json_loads(content):
+    """解析JSON字节串或字符串（有orjson时使用orjson）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+# 按站点的令牌桶限速：突发容量、每秒补充令牌数
+RATE_LIMIT_BURST = 5
+RATE_LIMIT_PER_SECOND = 2.0
+
+# 遇到429/5xx时的最大重试次数（退避时间 min(60, 2**重试次数) 秒）
+HTTP_MAX_RETRIES = 3
+
+# akshare新闻表中可能的列名（按优先级排列）
+TITLE_COLUMNS = ('文章标题', '标题', 'title')
+CONTENT_COLUMNS = ('内容', 'content', '文章内容')
+TIME_COLUMNS = ('发布时间', 'time', 'date', '时间', '日期', 'publish_time')
+
+def _first_column(df, candidates):
+    """按优先级返回DataFrame中第一个存在的候选列名，都不存在时返回None"""
+    columns = df.columns
+    return next((col for col in candidates if col is not None and col in columns), None)
+
+def _column_strings(df, columns, default, max_len=None):
+    """取第一个存在的列并逐值转为字符串（可截断）；列都不存在时返回默认值列表"""
+    col = _first_column(df, columns)
+    if col is None:
+        return [default] * len(df)
+    values = [str(value) for value in df[col].tolist()]
+    if max_len is not None:
+        values = [value[:max_len] for value in values]
+    return values
+
+# 缓存文件所在目录（默认为本模块目录，可用TA_NEWS_CACHE_DIR指定，不随启动时的工作目录变化）
+NEWS_CACHE_DIR = os.environ.get('TA_NEWS_CACHE_DIR') or os.path.dirname(os.path.abspath(__file__))
+
+# 跨运行的新闻持久化缓存
+NEWS_CACHE_DB = os.path.join(NEWS_CACHE_DIR, 'news_cache.db')
+
+# requests_cache的HTTP响应缓存（sqlite后端会自动加.sqlite后缀）
+HTTP_CACHE_NAME = os.path.join(NEWS_CACHE_DIR, '.futures_news_cache')
+
+# 各来源当天已缓存的新闻数达到该数量时跳过联网抓取（与各来源返回上限一致）
+NEWS_CACHE_TARGETS = {'search_api': 15, 'web_scraping': 10, 'rss': 8}
+
+NEWS_CACHE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS news (
+    commodity TEXT NOT NULL,
+    url_hash INTEGER NOT NULL,
+    title TEXT,
+    content TEXT,
+    url TEXT,
+    source TEXT,
+    source_type TEXT,
+    date TEXT,
+    relevance REAL,
+    type TEXT,
+    fetched TEXT,
+    PRIMARY KEY (commodity, url_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_news_lookup ON news (commodity, source_type, fetched, date);
+CREATE TABLE IF NOT EXISTS analyses (
+    request_hash TEXT PRIMARY KEY,
+    result TEXT,
+    created REAL
+);
+'''
+
+# AI分析结果缓存有效期（秒）：同一请求体在有效期内直接复用报告
+ANALYSIS_CACHE_TTL = 6 * 3600
+
+NEWS_CACHE_COLUMNS = ('title', 'content', 'url', 'source', 'source_type', 'date', 'relevance', 'type')
+
+def url_hash(url):
+    """URL的64位有符号整数哈希（SQLite INTEGER主键可直接存储）"""
+    digest = hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+# 标题去重时忽略的空白和结尾省略号/句点
+TITLE_NOISE_PATTERN = re.compile(r'\s+|[…\.]+$')
+
+def title_fingerprint(title):
+    """标题归一化后的去重指纹（有mmh3时为64位整数）"""
+    normalized = TITLE_NOISE_PATTERN.sub('', title.lower())
+    if MMH3_AVAILABLE:
+        return mmh3.hash64(normalized)[0]
+    return normalized
+
+# 综合去重时标题只保留字母数字和汉字
+TITLE_KEY_STRIP_PATTERN = re.compile(r'[^\w\u4e00-\u9fff]')
+
+# AI报告中需清理的Markdown符号（按顺序依次替换）
+# 第三项为匹配必需的字面量：替换只删除字符、不引入新字符，文本中不含任一字面量时可跳过该轮扫描
+MARKDOWN_CLEAN_PATTERNS = (
+    (re.compile(r'#{1,6}\s*'), '', ('#',)),  # 标题符号
+    (re.compile(r'\*\*(.*?)\*\*'), r'\1', ('**',)),  # 粗体
+    (re.compile(r'\*(.*?)\*'), r'\1', ('*',)),  # 斜体
+    (re.compile(r'`(.*?)`'), r'\1', ('`',)),  # 行内代码
+    (re.compile(r'```.*?```'), '', ('```',)),  # 代码块
+    (re.compile(r'^\s*[-*+]\s+', re.MULTILINE), '', ('-', '*', '+')),  # 列表符号
+    (re.compile(r'^\s*\d+\.\s+', re.MULTILINE), '', ('.',)),  # 数字列表
+    (re.compile(r'>\s*'), '', ('>',)),  # 引用符号
+    (re.compile(r'\[([^\]]+)\]\([^)]+\)'), r'\1', ('](',)),  # 链接
+    (re.compile(r'!\[([^\]]*)\]\([^)]+\)'), r'\1', ('![',)),  # 图片
+    (re.compile(r'^\s*\|.*\|\s*$', re.MULTILINE), '', ('|',)),  # 表格
+    (re.compile(r'^\s*[-=]{3,}\s*$', re.MULTILINE), '', ('-', '=')),  # 分割线
+)
+EXCESS_BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+
+# AI报告中出现即视为虚假内容的提示词（一次扫描匹配全部）
+FAKE_CONTENT_INDICATORS = ("模拟新闻", "假设新闻", "(新闻", "编造", "虚构")
+FAKE_CONTENT_PATTERN = re.compile('|'.join(map(re.escape, FAKE_CONTENT_INDICATORS)))
+
+# 新闻相关性判断关键词
+FUTURES_KEYWORDS = ('期货', '价格', '市场', '合约', '交易', '涨跌', '行情', '分析', '预测', '走势')
+EXCLUDE_KEYWORDS = ('股票', '基金', '保险', '银行', '房地产', '招聘', '广告')  # 排除词（减少无关新闻）
+FUTURES_KEYWORD_SET = frozenset(FUTURES_KEYWORDS)
+EXCLUDE_KEYWORD_SET = frozenset(EXCLUDE_KEYWORDS)
+
+# 相关性评分词及权重（顺序即累加顺序）
+RELEVANCE_WORD_WEIGHTS = (
+    # 期货相关词汇
+    ('期货', 1.0), ('价格', 1.0), ('涨跌', 1.0), ('行情', 1.0),
+    ('合约', 1.0), ('交易', 1.0), ('市场', 1.0), ('分析', 1.0),
+    # 时效性词汇
+    ('今日', 0.5), ('昨日', 0.5), ('最新', 0.5), ('最近', 0.5),
+    ('今天', 0.5), ('现在', 0.5), ('目前', 0.5),
+    # 专业词汇
+    ('技术分析', 0.8), ('基本面', 0.8), ('供需', 0.8), ('库存', 0.8),
+    ('产能', 0.8), ('需求', 0.8), ('供应', 0.8),
+)
+
+# 依赖检查通过的标记文件：内容为检查过的包列表，且须晚于当前解释器修改时间才有效
+BOOTSTRAP_SENTINEL = os.path.join(os.path.expanduser('~'), '.futures_bootstrap_ok')
+
+def _bootstrap_verified(packages_key):
+    """判断依赖检查结果是否仍然有效（设置TA_SKIP_BOOTSTRAP=1可直接跳过检查）"""
+    if os.environ.get('TA_SKIP_BOOTSTRAP', '').strip().lower() in {'1', 'true', 'yes'}:
+        return True
+    try:
+        if os.stat(BOOTSTRAP_SENTINEL).st_mtime <= os.stat(sys.executable).st_mtime:
+            return False
+        with open(BOOTSTRAP_SENTINEL, encoding='utf-8') as f:
+            return f.read() == packages_key
+    except OSError:
+        return False
+
+@lru_cache(maxsize=None)
 def install_and_import():
-    """安装并导入必要的库"""
-    packages = ['akshare', 'pandas', 'requests', 'beautifulsoup4', 'feedparser', 'python-dateutil']
+    """安装并导入必要的库（结果缓存，同一进程内只检查一次）"""
+    packages = ['akshare', 'pandas', 'requests', 'beautifulsoup4', 'lxml', 'feedparser', 'python-dateutil']
+    packages_key = ','.join(packages)
     
-    for package in packages:
+    if not _bootstrap_verified(packages_key):
+        for package in packages:
+            try:
+                if package == 'beautifulsoup4':
+                    importlib.import_module('bs4')
+                elif package == 'python-dateutil':
+                    importlib.import_module('dateutil')
+                else:
+                    importlib.import_module(package)
+            except ImportError:
+                print(f"📦 正在安装 {package}...")
+                subprocess.check_call([sys.executable, "-m", "pip", "install", package, "-q"])
+        
         try:
-            if package == 'beautifulsoup4':
-                importlib.import_module('bs4')
-            elif package == 'python-dateutil':
-                importlib.import_module('dateutil')
-            else:
-                importlib.import_module(package)
-        except ImportError:
-            print(f"📦 正在安装 {package}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package, "-q"])
+            with open(BOOTSTRAP_SENTINEL, 'w', encoding='utf-8') as f:
+                f.write(packages_key)
+        except OSError:
+            pass  # 标记文件写入失败只影响下次启动速度
     
     import akshare as ak
     import pandas as pd
@@ -52,9 +257,79 @@ def install_and_import():
     
     return ak, pd, requests, BeautifulSoup, feedparser, date_parser
 
+@dataclass
+class NewsBatch:
+    """新闻记录的列式缓冲区（每个字段一个列表）
+
+    单批只有几十条，去重和排序直接在列表上完成（比先构建DataFrame快得多），
+    输出为新闻字典列表，需要表格时由调用方在出口处再转DataFrame。
+    """
+    titles: List[str] = field(default_factory=list)
+    contents: List[str] = field(default_factory=list)
+    urls: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    source_types: List[str] = field(default_factory=list)
+    dates: List[str] = field(default_factory=list)
+    relevances: List[float] = field(default_factory=list)
+    types: List[str] = field(default_factory=list)
+    
+    def __len__(self):
+        return len(self.titles)
+    
+    def add(self, title, content, url, source, source_type, date, relevance, news_type):
+        """追加一条新闻"""
+        self.titles.append(title)
+        self.contents.append(content)
+        self.urls.append(url)
+        self.sources.append(source)
+        self.source_types.append(source_type)
+        self.dates.append(date)
+        self.relevances.append(relevance)
+        self.types.append(news_type)
+    
+    def extend(self, other: 'NewsBatch'):
+        """追加另一批新闻"""
+        self.titles.extend(other.titles)
+        self.contents.extend(other.contents)
+        self.urls.extend(other.urls)
+        self.sources.extend(other.sources)
+        self.source_types.extend(other.source_types)
+        self.dates.extend(other.dates)
+        self.relevances.extend(other.relevances)
+        self.types.extend(other.types)
+    
+    def to_records(self) -> List[Dict]:
+        """转换为新闻字典列表（键顺序与原新闻字典一致）"""
+        return [
+            {'title': title, 'content': content, 'url': url, 'source': source,
+             'source_type': source_type, 'date': date, 'relevance': relevance, 'type': news_type}
+            for title, content, url, source, source_type, date, relevance, news_type in zip(
+                self.titles, self.contents, self.urls, self.sources,
+                self.source_types, self.dates, self.relevances, self.types)
+        ]
+    
+    def to_unique_records(self) -> List[Dict]:
+        """转换为新闻字典列表并按标题指纹去重（保留首次出现的新闻）"""
+        seen = set()
+        unique = []
+        for record in self.to_records():
+            fingerprint = title_fingerprint(record['title'])
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                unique.append(record)
+        return unique
+
 class ProfessionalFuturesNewsAnalyzer:
     """专业版期货新闻分析器"""
     
+    __slots__ = (
+        'deepseek_api_key', 'deepseek_url', 'serper_key',
+        'pd', 'requests', 'time', 'datetime', 'timedelta', 'session', '_scrape_session', '_http_client',
+        'all_commodities', 'symbol_to_name', '_menu_index',
+        '_commodity_choices', '_commodity_lower', '_keyword_matchers', '_commodity_kw_cache', '_serper_results_cache',
+        '_news_db', '_news_db_lock', '_buckets', '_bucket_lock',
+    )
+    
     def __init__(self, deepseek_api_key, serper_key="d3654e36956e0bf331e901886c49c602cea72eb1"):
         self.deepseek_api_key = deepseek_api_key
         self.deepseek_url = "https://api.deepseek.com/v1/chat/completions"
@@ -62,9 +337,10 @@ class ProfessionalFuturesNewsAnalyzer:
         # Serper搜索API密钥（已内置）
         self.serper_key = serper_key
         
-        # 导入必要模块
+        # 导入必要模块（网络相关依赖在此按需导入）
         import pandas as pd
         import requests
+        import httpx
         import time
         from datetime import datetime, timedelta
         
@@ -74,8 +350,27 @@ class ProfessionalFuturesNewsAnalyzer:
         self.datetime = datetime
         self.timedelta = timedelta
         
-        # 初始化会话
-        self.session = requests.Session()
+        # 初始化会话（有requests_cache时缓存Serper/RSS响应30分钟；网页抓取走下面不缓存的会话）
+        http_cache_enabled = False
+        if REQUESTS_CACHE_AVAILABLE:
+            import requests_cache
+            try:
+                self.session = requests_cache.CachedSession(
+                    cache_name=HTTP_CACHE_NAME,
+                    backend='sqlite',
+                    expire_after=1800,
+                    allowable_methods=('GET', 'POST'),
+                )
+                http_cache_enabled = True
+            except (sqlite3.Error, OSError) as e:
+                print(f"⚠️ HTTP响应缓存不可用，本次不使用缓存: {e}")
+        if not http_cache_enabled:
+            self.session = requests.Session()
+        # 各来源并发抓取，放大连接池避免并发请求时连接被丢弃重建；
+        # 429/5xx重试由_rate_limited按站点退避处理，这里不再叠加urllib3重试
+        pooled_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32)
+        self.session.mount('https://', pooled_adapter)
+        self.session.mount('http://', pooled_adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -88,6 +383,24 @@ class ProfessionalFuturesNewsAnalyzer:
             'Sec-Fetch-Site': 'none',
         })
         
+        # 网页流式抓取使用不带缓存的会话：CachedSession会先读完整个响应体再返回，
+        # stream=True与MAX_SCRAPE_BYTES的截断失效
+        if http_cache_enabled:
+            self._scrape_session = requests.Session()
+            scrape_adapter = requests.adapters.HTTPAdapter(pool_connections=16, pool_maxsize=32)
+            self._scrape_session.mount('https://', scrape_adapter)
+            self._scrape_session.mount('http://', scrape_adapter)
+            self._scrape_session.headers.update(self.session.headers)
+        else:
+            self._scrape_session = self.session
+        
+        # DeepSeek接口不缓存，使用长连接池（安装h2时启用HTTP/2多路复用），避免每次分析重新握手TLS
+        self._http_client = httpx.Client(
+            http2=importlib.util.find_spec('h2') is not None,
+            limits=httpx.Limits(max_keepalive_connections=32),
+            timeout=15.0,
+        )
+        
         # 使用原有的品种配置
         self.all_commodities = {
             # 上海期货交易所(SHFE)
@@ -171,27 +484,167 @@ class ProfessionalFuturesNewsAnalyzer:
             "碳酸锂": {"exchange": "GFEX", "symbol": "LC", "akshare_cat": ["小金属", "VIP", "财经"], "category": "小金属"}
         }
         
-        # 创建品种代码到中文名称的映射
+        # 品种配置为静态数据，冻结为只读映射
+        self.all_commodities = MappingProxyType(self.all_commodities)
+        
+        # 创建品种代码到中文名称的映射，并预先按交易所、类别分组菜单
         self.symbol_to_name = {}
+        self._menu_index = {}
         for name, config in self.all_commodities.items():
+            # 交易所、类别字符串驻留，分组比较时只需比较指针
+            config["exchange"] = sys.intern(config["exchange"])
+            config["category"] = sys.intern(config["category"])
             self.symbol_to_name[config["symbol"]] = name
+            self._menu_index.setdefault(config["exchange"], {}).setdefault(config["category"], []).append(name)
+        
+        # 品种名称候选（模糊匹配用，小写形式预先计算）
+        self._commodity_choices = list(self.all_commodities)
+        self._commodity_lower = [(name, name.lower()) for name in self._commodity_choices]
+        
+        # 按品种缓存的关键词匹配器和品种关键词
+        self._keyword_matchers = {}
+        self._commodity_kw_cache = {}
+        
+        # Serper搜索结果缓存：(品种, 回溯天数, 日期) -> 新闻列表
+        self._serper_results_cache = {}
+        
+        # 跨运行的新闻持久化缓存（Streamlit可能从不同线程调用，访问时加锁）；
+        # 缓存目录不可写等情况下缓存不可用（_news_db为None），分析照常进行
+        try:
+            self._news_db = sqlite3.connect(NEWS_CACHE_DB, check_same_thread=False)
+            self._news_db.executescript(NEWS_CACHE_SCHEMA)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ 新闻缓存不可用，本次不使用缓存: {e}")
+            self._news_db = None
+        self._news_db_lock = threading.Lock()
+        
+        # 按站点的令牌桶：host -> (剩余令牌, 上次补充时间)
+        self._buckets = {}
+        self._bucket_lock = threading.Lock()
         
         print(f"✅ 专业报告版分析系统初始化完成，支持 {len(self.all_commodities)} 个品种")
         print("📊 专业特性：研究机构级别的分析报告 + 完整新闻链接标注 + 纯文本格式")
     
+    def close(self):
+        """关闭HTTP连接池"""
+        self._http_client.close()
+        self._scrape_session.close()
+        self.session.close()
+        if self._news_db is not None:
+            self._news_db.close()
+    
+    def clear_http_cache(self):
+        """清空HTTP响应缓存"""
+        if self._scrape_session is not self.session:
+            self.session.cache.clear()
+            print("🧹 已清空HTTP响应缓存")
+    
+    def clear_news_cache(self):
+        """清空持久化的新闻缓存"""
+        if self._news_db is None:
+            return
+        with self._news_db_lock, self._news_db:
+            self._news_db.execute("DELETE FROM news")
+            self._news_db.execute("DELETE FROM analyses")
+        print("🧹 已清空新闻缓存")
+    
+    def _acquire_token(self, host):
+        """从站点令牌桶取一个令牌，桶空时等待补充"""
+        while True:
+            with self._bucket_lock:
+                now = time.monotonic()
+                tokens, last_refill = self._buckets.get(host, (RATE_LIMIT_BURST, now))
+                tokens = min(RATE_LIMIT_BURST, tokens + (now - last_refill) * RATE_LIMIT_PER_SECOND)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / RATE_LIMIT_PER_SECOND
+            time.sleep(wait)
+    
+    def _rate_limited(self, url, fn):
+        """按站点限速发送请求，遇到429/5xx时指数退避重试"""
+        host = urlsplit(url).netloc
+        for retry in range(HTTP_MAX_RETRIES + 1):
+            self._acquire_token(host)
+            response = fn()
+            if (response.status_code != 429 and response.status_code < 500) or retry == HTTP_MAX_RETRIES:
+                return response
+            response.close()
+            time.sleep(min(60, 2 ** retry))
+    
+    def _load_cached_news(self, commodity, source_type, cutoff_str):
+        """读取当天已抓取、日期在回溯窗口内的缓存新闻（按相关性降序）"""
+        if self._news_db is None:
+            return []
+        today_str = datetime.now().strftime('%Y-%m-%d')
+        with self._news_db_lock:
+            rows = self._news_db.execute(
+                f"SELECT {', '.join(NEWS_CACHE_COLUMNS)} FROM news "
+                "WHERE commodity = ? AND source_type = ? AND fetched = ? AND date >= ? "
+                "ORDER BY relevance DESC",
+                (commodity, source_type, today_str, cutoff_str),
+            ).fetchall()
+        return [dict(zip(NEWS_CACHE_COLUMNS, row)) for row in rows]
+    
+    def _store_news(self, commodity, news_list):
+        """将新抓取的新闻写入持久化缓存（按URL哈希去重，已存在的刷新内容和抓取日期）"""
+        if not news_list or self._news_db is None:
+            return
+        today_str = datetime.now().strftime('%Y-%m-%d')
+        rows = [
+            (commodity, url_hash(news['url'] or news['title']),
+             *(news[column] for column in NEWS_CACHE_COLUMNS), today_str)
+            for news in news_list
+        ]
+        with self._news_db_lock, self._news_db:
+            self._news_db.executemany(
+                "INSERT INTO news (commodity, url_hash, "
+                f"{', '.join(NEWS_CACHE_COLUMNS)}, fetched) VALUES ({', '.join('?' * (len(NEWS_CACHE_COLUMNS) + 3))}) "
+                "ON CONFLICT(commodity, url_hash) DO UPDATE SET "
+                f"{', '.join(f'{column} = excluded.{column}' for column in (*NEWS_CACHE_COLUMNS, 'fetched'))}",
+                rows,
+            )
+    
+    def _load_cached_analysis(self, request_hash):
+        """读取有效期内的AI分析结果，未命中返回None"""
+        if self._news_db is None:
+            return None
+        with self._news_db_lock:
+            row = self._news_db.execute(
+                "SELECT result FROM analyses WHERE request_hash = ? AND created >= ?",
+                (request_hash, time.time() - ANALYSIS_CACHE_TTL),
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _store_analysis(self, request_hash, result):
+        """保存AI分析结果（同一请求覆盖旧结果）"""
+        if self._news_db is None:
+            return
+        with self._news_db_lock, self._news_db:
+            self._news_db.execute(
+                "INSERT OR REPLACE INTO analyses (request_hash, result, created) VALUES (?, ?, ?)",
+                (request_hash, result, time.time()),
+            )
+    
+    def _cached_or_fetch(self, commodity, source_type, cutoff_str, fetch):
+        """缓存数量足够时直接返回缓存，否则联网抓取并写入缓存"""
+        target = NEWS_CACHE_TARGETS[source_type]
+        cached = self._load_cached_news(commodity, source_type, cutoff_str)
+        if len(cached) >= target:
+            print(f"  💾 {source_type} 命中新闻缓存：{len(cached)} 条")
+            return cached[:target]
+        
+        fetched = fetch()
+        self._store_news(commodity, fetched)
+        return fetched
+    
     # 保持原有的display_commodities_menu和get_user_input方法
     def display_commodities_menu(self):
         """显示品种选择菜单"""
         print("\n📋 中国期货市场商品期货品种列表")
         print("=" * 80)
         
-        exchanges = {}
-        for commodity, info in self.all_commodities.items():
-            exchange = info["exchange"]
-            if exchange not in exchanges:
-                exchanges[exchange] = []
-            exchanges[exchange].append(commodity)
-        
         exchange_names = {
             "SHFE": "上海期货交易所",
             "INE": "上海国际能源交易中心", 
@@ -200,15 +653,9 @@ class ProfessionalFuturesNewsAnalyzer:
             "GFEX": "广州期货交易所"
         }
         
-        for exchange_code, commodities in exchanges.items():
+        for exchange_code, categories in self._menu_index.items():
             exchange_name = exchange_names.get(exchange_code, exchange_code)
             print(f"\n🔸 {exchange_name} ({exchange_code}):")
-            categories = {}
-            for commodity in commodities:
-                category = self.all_commodities[commodity]["category"]
-                if category not in categories:
-                    categories[category] = []
-                categories[category].append(commodity)
             
             for category, category_commodities in categories.items():
                 print(f"   {category}: {', '.join(category_commodities)}")
@@ -216,6 +663,18 @@ class ProfessionalFuturesNewsAnalyzer:
         print(f"\n✅ 总计支持 {len(self.all_commodities)} 个商品期货品种")
         return list(self.all_commodities.keys())
     
+    def _suggest_commodities(self, commodity_input):
+        """为输入错误的品种名称给出相近品种建议"""
+        if RAPIDFUZZ_AVAILABLE:
+            matches = fuzz_process.extract(commodity_input, self._commodity_choices,
+                                           scorer=fuzz.partial_ratio, processor=fuzz_utils.default_process,
+                                           limit=10, score_cutoff=60)
+            return [name for name, _, _ in matches]
+        
+        input_lower = commodity_input.lower()
+        return [name for name, name_lower in self._commodity_lower
+                if input_lower in name_lower or name_lower in input_lower]
+    
     def get_user_input(self):
         """获取用户输入（增强日期验证）"""
         print("\n" + "=" * 80)
@@ -232,9 +691,7 @@ class ProfessionalFuturesNewsAnalyzer:
                 break
             else:
                 print(f"❌ 品种 '{commodity_input}' 不在支持列表中，请重新输入")
-                similar = [c for c in commodities_list if 
-                         commodity_input.lower() in c.lower() or 
-                         c.lower() in commodity_input.lower()]
+                similar = self._suggest_commodities(commodity_input)
                 if similar and len(similar) <= 10:
                     print(f"💡 您可能想找: {', '.join(similar)}")
         
@@ -315,22 +772,25 @@ class ProfessionalFuturesNewsAnalyzer:
         all_news = []
         total_fetched = 0
         
-        for category in akshare_categories:
+        # 各类别接口相互独立，并发请求
+        print(f"  📈 获取 {', '.join(akshare_categories)} 类别新闻...")
+        with ThreadPoolExecutor(max_workers=len(akshare_categories)) as executor:
+            futures = [executor.submit(ak.futures_news_shmet, symbol=category) for category in akshare_categories]
+        
+        # 按类别顺序处理结果，保证后续去重保留的条目稳定
+        for category, future in zip(akshare_categories, futures):
             try:
-                print(f"  📈 获取 {category} 类别新闻...")
-                news_df = ak.futures_news_shmet(symbol=category)
+                news_df = future.result()
                 
                 if not news_df.empty:
                     news_df['data_source'] = f"akshare_{category}"
                     news_df['source_type'] = 'akshare'
                     all_news.append(news_df)
                     total_fetched += len(news_df)
-                    print(f"      ✅ 获取到 {len(news_df)} 条真实新闻")
+                    print(f"      ✅ {category} 获取到 {len(news_df)} 条真实新闻")
                 else:
                     print(f"      ⚠️ {category} 类别暂无数据")
                 
-                self.time.sleep(1)
-                
             except Exception as e:
                 print(f"      ❌ 获取 {category} 失败: {e}")
         
@@ -340,12 +800,7 @@ class ProfessionalFuturesNewsAnalyzer:
         # 合并和去重
         combined_df = self.pd.concat(all_news, ignore_index=True)
         
-        title_columns = ['文章标题', '标题', 'title']
-        title_col = None
-        for col in title_columns:
-            if col in combined_df.columns:
-                title_col = col
-                break
+        title_col = _first_column(combined_df, TITLE_COLUMNS)
         
         if title_col:
             before_dedup = len(combined_df)
@@ -360,12 +815,12 @@ class ProfessionalFuturesNewsAnalyzer:
         # 构建新闻引用列表
         news_citations = []
         if not filtered_news.empty:
-            for idx, row in filtered_news.iterrows():
-                title = str(row.get(title_col, "无标题"))
-                source = str(row.get('data_source', 'akshare'))
-                date = str(row.get('发布时间', row.get('time', '未知日期')))
-                url = str(row.get('链接', row.get('url', '')))
-                
+            # 按列整体取值后逐条组合，避免iterrows逐行构造Series
+            titles = _column_strings(filtered_news, (title_col,), "无标题")
+            sources = _column_strings(filtered_news, ('data_source',), 'akshare')
+            dates = _column_strings(filtered_news, ('发布时间', 'time'), '未知日期')
+            urls = _column_strings(filtered_news, ('链接', 'url'), '')
+            for title, source, date, url in zip(titles, sources, dates, urls):
                 citation = {
                     'title': title,
                     'source': f"akshare官方数据-{source}",
@@ -379,14 +834,51 @@ class ProfessionalFuturesNewsAnalyzer:
         
         return filtered_news, total_fetched, news_citations
     
+    def _fetch_serper_query(self, query, days_back):
+        """执行单条Serper查询，返回organic结果（失败返回空列表）"""
+        try:
+            url = "https://google.serper.dev/search"
+            payload = json_dumps_bytes({
+                "q": query,
+                "num": 8,
+                "tbs": f"qdr:w{max(1, days_back//7 + 1)}",
+                "gl": "cn",
+                "hl": "zh-cn"
+            })
+            
+            headers = {
+                'X-API-KEY': self.serper_key,
+                'Content-Type': 'application/json'
+            }
+            
+            response = self._rate_limited(url, lambda: self.session.post(url, headers=headers, data=payload, timeout=15))
+            
+            if response.status_code == 200:
+                return json_loads(response.content).get('organic', [])
+            return []
+            
+        except Exception as e:
+            print(f"      ⚠️ 查询失败: {e}")
+            return []
+    
     def search_with_serper_api(self, commodity, days_back=3):
-        """使用Serper API搜索（增强链接记录）"""
+        """使用Serper API搜索（增强链接记录，同一天内相同查询直接复用已处理的结果）"""
+        cache_key = (commodity, days_back, datetime.now().strftime('%Y-%m-%d'))
+        cached_results = self._serper_results_cache.get(cache_key)
+        if cached_results is not None:
+            print(f"  🔍 Serper API搜索（使用缓存）...")
+            return [dict(item) for item in cached_results]
+        
+        results = self._search_with_serper_api(commodity, days_back)
+        if results:  # 不缓存失败或空结果
+            self._serper_results_cache[cache_key] = [dict(item) for item in results]
+        return results
+    
+    def _search_with_serper_api(self, commodity, days_back):
+        """执行Serper搜索、相关性过滤、去重和排序"""
         try:
             print(f"  🔍 Serper API搜索...")
             
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days_back)
-            
             # 优化搜索查询
             search_queries = [
                 f'{commodity}期货 价格 最新 site:eastmoney.com OR site:sina.com.cn OR site:hexun.com',
@@ -394,65 +886,33 @@ class ProfessionalFuturesNewsAnalyzer:
                 f'{commodity}期货 涨跌 原因 消息'
             ]
             
-            all_results = []
-            
-            for query in search_queries:
-                try:
-                    url = "https://google.serper.dev/search"
-                    payload = json.dumps({
-                        "q": query,
-                        "num": 8,
-                        "tbs": f"qdr:w{max(1, days_back//7 + 1)}",
-                        "gl": "cn",
-                        "hl": "zh-cn"
-                    })
-                    
-                    headers = {
-                        'X-API-KEY': self.serper_key,
-                        'Content-Type': 'application/json'
-                    }
-                    
-                    response = self.requests.post(url, headers=headers, data=payload, timeout=15)
-                    
-                    if response.status_code == 200:
-                        results = response.json()
-                        organic_results = results.get('organic', [])
-                        
-                        for item in organic_results:
-                            if self._is_relevant_financial_news(item.get('title', ''), item.get('snippet', ''), commodity):
-                                news_item = {
-                                    'title': item.get('title', ''),
-                                    'content': item.get('snippet', ''),
-                                    'url': item.get('link', ''),
-                                    'source': 'Serper搜索API',
-                                    'source_type': 'search_api',
-                                    'date': datetime.now().strftime('%Y-%m-%d'),
-                                    'relevance': self._calculate_relevance(item.get('title', '') + item.get('snippet', ''), commodity),
-                                    'type': 'serper_search'
-                                }
-                                all_results.append(news_item)
-                    
-                    time.sleep(1)  # 避免请求过快
-                    
-                except Exception as e:
-                    print(f"      ⚠️ 查询失败: {e}")
-                    continue
+            # 各查询互不依赖，并发请求（结果按查询顺序合并，保证去重结果稳定）
+            with ThreadPoolExecutor(max_workers=len(search_queries)) as executor:
+                query_results = list(executor.map(
+                    lambda query: self._fetch_serper_query(query, days_back), search_queries
+                ))
             
-            # 去重和排序
-            seen_titles = set()
-            unique_results = []
+            batch = NewsBatch()
+            today_str = datetime.now().strftime('%Y-%m-%d')
             
-            for result in all_results:
-                title = result['title']
-                if title not in seen_titles:
-                    seen_titles.add(title)
-                    unique_results.append(result)
+            for organic_results in query_results:
+                for item in organic_results:
+                    title = item.get('title', '')
+                    snippet = item.get('snippet', '')
+                    # 标题和摘要各转一次小写，过滤和评分共用
+                    title_lower, snippet_lower = title.lower(), snippet.lower()
+                    if self._is_relevant_financial_news(title, snippet, commodity,
+                                                        text_lower=f'{title_lower} {snippet_lower}'):
+                        batch.add(title, snippet, item.get('link', ''), 'Serper搜索API', 'search_api', today_str,
+                                  self._calculate_relevance(title + snippet, commodity,
+                                                            text_lower=title_lower + snippet_lower),
+                                  'serper_search')
             
-            # 按相关性排序
-            unique_results.sort(key=lambda x: x['relevance'], reverse=True)
+            # 去重后取相关性最高的15条（nlargest等价于稳定降序排序后截取，同分保持原有顺序）
+            unique_results = batch.to_unique_records()
             
             print(f"      ✅ 获取到 {len(unique_results)} 条相关新闻")
-            return unique_results[:15]
+            return nlargest(15, unique_results, key=itemgetter('relevance'))
                 
         except Exception as e:
             print(f"      ❌ Serper搜索出错: {e}")
@@ -463,7 +923,10 @@ class ProfessionalFuturesNewsAnalyzer:
         """优化的财经网站爬取（增强链接记录）"""
         print(f"  🕷️ 爬取财经网站（优化版）...")
         
-        all_scraped_news = []
+        batch = NewsBatch()
+        
+        # 仅在爬取时导入，避免拖慢菜单、--help等启动路径
+        from bs4 import BeautifulSoup
         
         # 简化的爬取策略（重点是稳定性）
         scrape_configs = [
@@ -479,12 +942,23 @@ class ProfessionalFuturesNewsAnalyzer:
             try:
                 print(f"    🌐 尝试 {config['name']}...")
                 
-                response = self.session.get(config['search_url'], timeout=8)
-                if config['encoding']:
-                    response.encoding = config['encoding']
+                # 流式读取，最多读取MAX_SCRAPE_BYTES（iter_content会自动解压gzip）
+                search_url = config['search_url']
+                with self._rate_limited(search_url, lambda: self._scrape_session.get(search_url, timeout=8, stream=True)) as response:
+                    html_bytes = b''
+                    if response.status_code == 200:
+                        chunks = []
+                        received = 0
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            chunks.append(chunk)
+                            received += len(chunk)
+                            if received >= MAX_SCRAPE_BYTES:
+                                break
+                        html_bytes = b''.join(chunks)[:MAX_SCRAPE_BYTES]
                 
-                if response.status_code == 200 and len(response.text) > 1000:
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                if len(html_bytes) > 1000:
+                    # 直接把字节交给C实现的lxml解析器，由其处理编码声明
+                    soup = BeautifulSoup(html_bytes, 'lxml', from_encoding=config['encoding'] or None)
                     
                     # 尝试多种选择器
                     items_found = []
@@ -524,23 +998,19 @@ class ProfessionalFuturesNewsAnalyzer:
                                 else:
                                     content = content_elem.get_text(strip=True)[:200]
                                 
-                                if title and len(title) > 5 and self._is_relevant_financial_news(title, content, commodity):
+                                title_lower, content_lower = title.lower(), content.lower()
+                                if title and len(title) > 5 and self._is_relevant_financial_news(
+                                        title, content, commodity, text_lower=f'{title_lower} {content_lower}'):
                                     # 处理相对URL
                                     if url and not url.startswith('http'):
                                         base_url = '/'.join(config['search_url'].split('/')[:3])
                                         url = base_url + url if url.startswith('/') else base_url + '/' + url
                                     
-                                    news_item = {
-                                        'title': title,
-                                        'content': content,
-                                        'url': url,
-                                        'source': config['name'],
-                                        'source_type': 'web_scraping',
-                                        'date': datetime.now().strftime('%Y-%m-%d'),
-                                        'relevance': self._calculate_relevance(title + content, commodity),
-                                        'type': 'web_scraping'
-                                    }
-                                    all_scraped_news.append(news_item)
+                                    batch.add(title, content, url, config['name'], 'web_scraping',
+                                              datetime.now().strftime('%Y-%m-%d'),
+                                              self._calculate_relevance(title + content, commodity,
+                                                                        text_lower=title_lower + content_lower),
+                                              'web_scraping')
                         except Exception:
                             continue
                     
@@ -548,23 +1018,56 @@ class ProfessionalFuturesNewsAnalyzer:
                 else:
                     print(f"      ⚠️ {config['name']} 响应异常")
                 
-                time.sleep(2)  # 爬虫间隔
-                
             except Exception as e:
                 print(f"      ❌ {config['name']} 失败: {e}")
                 continue
         
         # 去重
-        seen_titles = set()
-        unique_news = []
-        for news in all_scraped_news:
-            if news['title'] not in seen_titles:
-                seen_titles.add(news['title'])
-                unique_news.append(news)
+        unique_news = batch.to_unique_records()
         
         print(f"      ✅ 网页爬取获取到 {len(unique_news)} 条新闻")
         return unique_news[:10]
     
+    def _parse_one_feed(self, feed_name, feed_url, cutoff_date, commodity):
+        """解析单个RSS源，返回相关新闻NewsBatch（源无有效内容时返回None）"""
+        import feedparser
+        
+        print(f"    📡 尝试 {feed_name}...")
+        
+        # feedparser不支持timeout参数，先经会话（带超时和缓存）下载再解析
+        response = self._rate_limited(feed_url, lambda: self.session.get(feed_url, timeout=10))
+        feed = feedparser.parse(response.content)
+        
+        if not feed.entries:
+            print(f"      ⚠️ {feed_name} 无有效内容")
+            return None
+        
+        feed_news = NewsBatch()
+        for entry in feed.entries[:15]:
+            title = entry.get('title', '')
+            summary = entry.get('summary', entry.get('description', ''))
+            link = entry.get('link', '')
+            
+            # 时间过滤
+            pub_date = entry.get('published_parsed')
+            if pub_date:
+                pub_datetime = datetime(*pub_date[:6])
+                if pub_datetime < cutoff_date:
+                    continue
+            
+            # 相关性过滤（标题和摘要各转一次小写，过滤和评分共用）
+            title_lower, summary_lower = title.lower(), summary.lower()
+            if self._is_relevant_financial_news(title, summary, commodity,
+                                                text_lower=f'{title_lower} {summary_lower}'):
+                feed_news.add(title, summary[:200], link, f'{feed_name}_RSS', 'rss',
+                              pub_datetime.strftime('%Y-%m-%d') if pub_date else datetime.now().strftime('%Y-%m-%d'),
+                              self._calculate_relevance(title + summary, commodity,
+                                                        text_lower=title_lower + summary_lower),
+                              'rss_feed')
+        
+        print(f"      ✅ {feed_name} 获取到 {len(feed_news)} 条相关新闻")
+        return feed_news
+    
     def get_rss_news_optimized(self, commodity, days_back=3):
         """优化的RSS新闻获取（增强链接记录）"""
         print(f"  📡 获取RSS新闻（优化版）...")
@@ -578,63 +1081,41 @@ class ProfessionalFuturesNewsAnalyzer:
             '搜狐财经': 'http://rss.sohu.com/rss/finance.xml',
         }
         
-        all_rss_news = []
         cutoff_date = datetime.now() - timedelta(days=days_back)
-        working_feeds = 0
+        feed_results = {}
         
-        for feed_name, feed_url in rss_feeds.items():
-            try:
-                print(f"    📡 尝试 {feed_name}...")
-                
-                # feedparser不支持timeout参数，使用默认解析
-                feed = feedparser.parse(feed_url)
-                
-                if feed.entries and len(feed.entries) > 0:
-                    working_feeds += 1
-                    relevant_count = 0
-                    
-                    for entry in feed.entries[:15]:
-                        title = entry.get('title', '')
-                        summary = entry.get('summary', entry.get('description', ''))
-                        link = entry.get('link', '')
-                        
-                        # 时间过滤
-                        pub_date = entry.get('published_parsed')
-                        if pub_date:
-                            pub_datetime = datetime(*pub_date[:6])
-                            if pub_datetime < cutoff_date:
-                                continue
-                        
-                        # 相关性过滤
-                        if self._is_relevant_financial_news(title, summary, commodity):
-                            news_item = {
-                                'title': title,
-                                'content': summary[:200],
-                                'url': link,
-                                'source': f'{feed_name}_RSS',
-                                'source_type': 'rss',
-                                'date': pub_datetime.strftime('%Y-%m-%d') if pub_date else datetime.now().strftime('%Y-%m-%d'),
-                                'relevance': self._calculate_relevance(title + summary, commodity),
-                                'type': 'rss_feed'
-                            }
-                            all_rss_news.append(news_item)
-                            relevant_count += 1
-                    
-                    print(f"      ✅ {feed_name} 获取到 {relevant_count} 条相关新闻")
-                else:
-                    print(f"      ⚠️ {feed_name} 无有效内容")
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"      ❌ {feed_name} 失败: {e}")
-                continue
+        # 各RSS源位于不同站点，并发拉取；单个源失败或超时不影响其他源
+        executor = ThreadPoolExecutor(max_workers=len(rss_feeds))
+        futures = {
+            executor.submit(self._parse_one_feed, feed_name, feed_url, cutoff_date, commodity): feed_name
+            for feed_name, feed_url in rss_feeds.items()
+        }
+        try:
+            for future in as_completed(futures, timeout=20):
+                feed_name = futures[future]
+                try:
+                    feed_results[feed_name] = future.result()
+                except Exception as e:
+                    print(f"      ❌ {feed_name} 失败: {e}")
+        except FuturesTimeoutError:
+            print(f"      ⚠️ 部分RSS源超时，已跳过")
+        finally:
+            executor.shutdown(wait=False)
+        
+        # 按RSS源顺序合并，保证同分新闻的排序稳定
+        batch = NewsBatch()
+        working_feeds = 0
+        for feed_name in rss_feeds:
+            feed_news = feed_results.get(feed_name)
+            if feed_news is not None:
+                working_feeds += 1
+                batch.extend(feed_news)
         
-        # 按相关性排序
-        all_rss_news.sort(key=lambda x: x['relevance'], reverse=True)
+        # 按相关性取前8条（同分保持合并顺序）
+        all_rss_news = batch.to_records()
         
         print(f"      ✅ RSS获取完成，有效源: {working_feeds} 个，相关新闻: {len(all_rss_news)} 条")
-        return all_rss_news[:8]
+        return nlargest(8, all_rss_news, key=itemgetter('relevance'))
     
     def comprehensive_news_search(self, commodity, target_date, days_back):
         """综合新闻搜索（增强链接记录）"""
@@ -650,18 +1131,26 @@ class ProfessionalFuturesNewsAnalyzer:
             return []
         
         all_search_news = []
-        
-        # 1. Serper API搜索（已集成密钥）
-        serper_news = self.search_with_serper_api(commodity_name, days_back)
-        all_search_news.extend(serper_news)
-        
-        # 2. 优化的网页爬虫
-        scraped_news = self.scrape_financial_websites_optimized(commodity_name, days_back)
-        all_search_news.extend(scraped_news)
-        
-        # 3. 优化的RSS订阅
-        rss_news = self.get_rss_news_optimized(commodity_name, days_back)
-        all_search_news.extend(rss_news)
+        cutoff_str = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        
+        # 三类来源互不依赖且都受网络IO限制，并发获取，总耗时取最慢的一路
+        sources = (
+            # 1. Serper API搜索（已集成密钥）
+            ('search_api', self.search_with_serper_api),
+            # 2. 优化的网页爬虫
+            ('web_scraping', self.scrape_financial_websites_optimized),
+            # 3. 优化的RSS订阅
+            ('rss', self.get_rss_news_optimized),
+        )
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = [
+                executor.submit(self._cached_or_fetch, commodity_name, source_type, cutoff_str,
+                                lambda fetch=fetch: fetch(commodity_name, days_back))
+                for source_type, fetch in sources
+            ]
+            # 按来源固定顺序合并，保证去重时的优先级与串行时一致
+            for future in futures:
+                all_search_news.extend(future.result())
         
         # 全局去重
         seen_titles = set()
@@ -669,18 +1158,19 @@ class ProfessionalFuturesNewsAnalyzer:
         
         for news in all_search_news:
             title = news['title']
+            # 过短的标题直接跳过，无需计算去重键
+            if len(title) <= 5:
+                continue
             # 更严格的去重逻辑
-            title_key = re.sub(r'[^\w\u4e00-\u9fff]', '', title.lower())
-            if title_key not in seen_titles and len(title) > 5:
+            title_key = TITLE_KEY_STRIP_PATTERN.sub('', title.lower())
+            if title_key not in seen_titles:
                 seen_titles.add(title_key)
                 unique_news.append(news)
         
-        # 按相关性排序
-        unique_news.sort(key=lambda x: x['relevance'], reverse=True)
-        
         print(f"  ✅ 综合搜索完成：{len(unique_news)} 条优质新闻")
         
-        return unique_news[:25]
+        # 只取相关性最高的25条（等价于稳定降序排序后截取前25条）
+        return nlargest(25, unique_news, key=itemgetter('relevance'))
     
     # 保持原有的辅助方法
     def _filter_news_by_date(self, news_df, target_date, days_back):
@@ -688,22 +1178,16 @@ class ProfessionalFuturesNewsAnalyzer:
         if news_df.empty:
             return news_df
         
-        time_columns = ['发布时间', 'time', 'date', '时间', '日期', 'publish_time']
-        time_col = None
-        
-        for col in time_columns:
-            if col in news_df.columns:
-                time_col = col
-                break
+        time_col = _first_column(news_df, TIME_COLUMNS)
         
         if time_col is None:
             print("  ⚠️ 未找到时间列，返回最新100条新闻")
             return news_df.head(100)
         
         try:
-            # 更鲁棒的时间转换
-            news_df[time_col] = self.pd.to_datetime(news_df[time_col], errors='coerce', utc=True)
-            news_df[time_col] = news_df[time_col].dt.tz_localize(None)  # 移除时区信息
+            # 更鲁棒的时间转换（cache=True：同一时间字符串只解析一次）
+            times = self.pd.to_datetime(news_df[time_col], errors='coerce', utc=True, cache=True).dt.tz_convert(None)  # 移除时区信息
+            news_df[time_col] = times
             
             # 计算时间范围
             end_date = target_date + self.timedelta(days=1)
@@ -714,13 +1198,13 @@ class ProfessionalFuturesNewsAnalyzer:
             start_datetime = datetime.combine(start_date, datetime.min.time())
             
             # 时间筛选
-            mask = (news_df[time_col] >= start_datetime) & (news_df[time_col] < end_datetime)
+            mask = times.between(start_datetime, end_datetime, inclusive='left')
             filtered_df = news_df[mask]
             
             if filtered_df.empty:
                 print(f"  ⚠️ 指定时间段内无新闻，扩大到前{days_back*2}天")
                 extended_start = start_datetime - self.timedelta(days=days_back)
-                mask = (news_df[time_col] >= extended_start) & (news_df[time_col] < end_datetime)
+                mask = times.between(extended_start, end_datetime, inclusive='left')
                 filtered_df = news_df[mask]
                 
                 if filtered_df.empty:
@@ -733,86 +1217,107 @@ class ProfessionalFuturesNewsAnalyzer:
             print(f"  ⚠️ 日期筛选出错: {e}，返回最新{days_back*20}条新闻")
             return news_df.head(days_back*20)
     
-    def _is_relevant_financial_news(self, title, content, commodity):
-        """判断新闻相关性（优化版）"""
-        text = (title + ' ' + content).lower()
-        
-        # 期货相关关键词
-        futures_keywords = ['期货', '价格', '市场', '合约', '交易', '涨跌', '行情', '分析', '预测', '走势']
-        commodity_keywords = [commodity.lower(), f'{commodity}价格', f'{commodity}市场', f'{commodity}行情']
+    def _commodity_keywords(self, commodity):
+        """品种相关关键词（按品种缓存为frozenset）"""
+        keywords = self._commodity_kw_cache.get(commodity)
+        if keywords is None:
+            keywords = frozenset((commodity.lower(), f'{commodity}价格', f'{commodity}市场', f'{commodity}行情'))
+            self._commodity_kw_cache[commodity] = keywords
+        return keywords
+    
+    def _get_keyword_matcher(self, commodity):
+        """获取品种的关键词匹配函数（首次使用时构建并缓存），返回文本中出现过的关键词集合
+
+        各来源常有重复的标题和摘要，匹配结果按文本做LRU缓存。
+        """
+        matcher = self._keyword_matchers.get(commodity)
+        if matcher is not None:
+            return matcher
+        
+        words = set(FUTURES_KEYWORD_SET | EXCLUDE_KEYWORD_SET | self._commodity_keywords(commodity))
+        words.add(f'{commodity}期货')
+        words.update(word for word, _ in RELEVANCE_WORD_WEIGHTS)
+        
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for word in words:
+                automaton.add_word(word, word)
+            automaton.make_automaton()
+            
+            @lru_cache(maxsize=4096)
+            def matcher(text):
+                return frozenset(word for _, word in automaton.iter(text))
+        else:
+            word_list = tuple(words)
+            
+            @lru_cache(maxsize=4096)
+            def matcher(text):
+                return frozenset(word for word in word_list if word in text)
         
-        # 排除词（减少无关新闻）
-        exclude_keywords = ['股票', '基金', '保险', '银行', '房地产', '招聘', '广告']
+        self._keyword_matchers[commodity] = matcher
+        return matcher
+    
+    def _is_relevant_financial_news(self, title, content, commodity, text_lower=None):
+        """判断新闻相关性（优化版）；text_lower为调用方已算好的 (title + ' ' + content).lower()"""
+        if text_lower is None:
+            text_lower = (title + ' ' + content).lower()
+        found = self._get_keyword_matcher(commodity)(text_lower)
         
         # 检查相关性
-        has_commodity = any(keyword in text for keyword in commodity_keywords)
-        has_futures = any(keyword in text for keyword in futures_keywords)
-        has_exclude = any(keyword in text for keyword in exclude_keywords)
+        has_commodity = not found.isdisjoint(self._commodity_keywords(commodity))
+        has_futures = not found.isdisjoint(FUTURES_KEYWORD_SET)
+        has_exclude = not found.isdisjoint(EXCLUDE_KEYWORD_SET)
         
         return has_commodity and has_futures and not has_exclude
     
-    def _calculate_relevance(self, text, commodity):
-        """计算相关性得分（优化版）"""
-        text = text.lower()
+    def _calculate_relevance(self, text, commodity, text_lower=None):
+        """计算相关性得分（优化版）；text_lower为调用方已算好的 text.lower()"""
+        if text_lower is None:
+            text_lower = text.lower()
+        found = self._get_keyword_matcher(commodity)(text_lower)
         score = 0.0
         
         # 商品名称匹配（高权重）
-        if commodity.lower() in text:
+        if commodity.lower() in found:
             score += 5.0
             # 精确匹配额外加分
-            if f'{commodity}期货' in text:
+            if f'{commodity}期货' in found:
                 score += 2.0
         
-        # 期货相关词汇
-        futures_words = ['期货', '价格', '涨跌', '行情', '合约', '交易', '市场', '分析']
-        for word in futures_words:
-            if word in text:
-                score += 1.0
-        
-        # 时效性词汇
-        timely_words = ['今日', '昨日', '最新', '最近', '今天', '现在', '目前']
-        for word in timely_words:
-            if word in text:
-                score += 0.5
-        
-        # 专业词汇加分
-        professional_words = ['技术分析', '基本面', '供需', '库存', '产能', '需求', '供应']
-        for word in professional_words:
-            if word in text:
-                score += 0.8
+        # 期货相关、时效性、专业词汇
+        for word, weight in RELEVANCE_WORD_WEIGHTS:
+            if word in found:
+                score += weight
         
         return min(score, 10.0)  # 最高10分
     
+    @staticmethod
+    def _read_stream_content(response):
+        """读取DeepSeek流式响应（SSE），拼接各增量片段为完整文本"""
+        parts = []
+        for line in response.iter_lines():
+            if not line.startswith('data:'):
+                continue
+            payload = line[5:].strip()
+            if payload == '[DONE]':
+                break
+            delta = json_loads(payload)['choices'][0].get('delta', {})
+            parts.append(delta.get('content') or '')
+        return ''.join(parts)
+    
     def _clean_markdown_symbols(self, text: str) -> str:
         """清理Markdown符号"""
         if not text:
             return text
         
         # 清理各种Markdown符号
-        patterns = [
-            (r'#{1,6}\s*', ''),  # 标题符号
-            (r'\*\*(.*?)\*\*', r'\1'),  # 粗体
-            (r'\*(.*?)\*', r'\1'),  # 斜体
-            (r'`(.*?)`', r'\1'),  # 行内代码
-            (r'```.*?```', ''),  # 代码块
-            (r'^\s*[-*+]\s+', '', re.MULTILINE),  # 列表符号
-            (r'^\s*\d+\.\s+', '', re.MULTILINE),  # 数字列表
-            (r'>\s*', ''),  # 引用符号
-            (r'\[([^\]]+)\]\([^)]+\)', r'\1'),  # 链接
-            (r'!\[([^\]]*)\]\([^)]+\)', r'\1'),  # 图片
-            (r'^\s*\|.*\|\s*$', '', re.MULTILINE),  # 表格
-            (r'^\s*[-=]{3,}\s*$', '', re.MULTILINE),  # 分割线
-        ]
-        
         cleaned_text = text
-        for pattern, replacement, *flags in patterns:
-            if flags:
-                cleaned_text = re.sub(pattern, replacement, cleaned_text, flags=flags[0])
-            else:
-                cleaned_text = re.sub(pattern, replacement, cleaned_text)
+        for pattern, replacement, literals in MARKDOWN_CLEAN_PATTERNS:
+            if any(literal in cleaned_text for literal in literals):
+                cleaned_text = pattern.sub(replacement, cleaned_text)
         
         # 清理多余的空行
-        cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
+        cleaned_text = EXCESS_BLANK_LINES_PATTERN.sub('\n\n', cleaned_text)
         
         return cleaned_text.strip()
     
@@ -823,42 +1328,21 @@ class ProfessionalFuturesNewsAnalyzer:
         # 支持中文名称和英文代码
         if commodity in self.all_commodities:
             config = self.all_commodities[commodity]
+        elif commodity in self.symbol_to_name:
+            # 通过英文代码查找
+            config = self.all_commodities[self.symbol_to_name[commodity]]
         else:
-            # 尝试通过英文代码查找
-            config = None
-            for chinese_name, cfg in self.all_commodities.items():
-                if cfg.get("symbol") == commodity:
-                    config = cfg
-                    break
-
-            if not config:
-                raise KeyError(f"未找到品种配置: {commodity}")
+            raise KeyError(f"未找到品种配置: {commodity}")
         
         # 准备akshare新闻内容
         akshare_content = ""
         if not akshare_df.empty:
-            content_columns = ['内容', 'content', '文章内容']
-            title_columns = ['文章标题', '标题', 'title']
-            
-            title_col = None
-            content_col = None
-            
-            for col in title_columns:
-                if col in akshare_df.columns:
-                    title_col = col
-                    break
-            
-            for col in content_columns:
-                if col in akshare_df.columns:
-                    content_col = col
-                    break
-            
             akshare_summaries = []
-            for i, (_, row) in enumerate(akshare_df.head(15).iterrows()):
-                title = str(row[title_col]) if title_col else "无标题"
-                content = str(row[content_col])[:300] if content_col else "无内容"
-                source = str(row.get('data_source', 'akshare'))
-                
+            head_df = akshare_df.head(15)
+            titles = _column_strings(head_df, TITLE_COLUMNS, "无标题")
+            contents = _column_strings(head_df, CONTENT_COLUMNS, "无内容", max_len=300)
+            sources = _column_strings(head_df, ('data_source',), 'akshare')
+            for i, (title, content, source) in enumerate(zip(titles, contents, sources)):
                 summary = f"【权威数据{i+1}】\n标题：{title}\n内容：{content}...\n来源：{source}\n"
                 akshare_summaries.append(summary)
             
@@ -875,11 +1359,12 @@ class ProfessionalFuturesNewsAnalyzer:
             search_content = "\n".join(search_summaries)
         
         # 构建分析内容
-        all_content = ""
+        content_parts = []
         if akshare_content:
-            all_content += f"=== akshare权威财经数据 ===\n{akshare_content}\n\n"
+            content_parts.append(f"=== akshare权威财经数据 ===\n{akshare_content}\n\n")
         if search_content:
-            all_content += f"=== 多源搜索新闻数据 ===\n{search_content}\n"
+            content_parts.append(f"=== 多源搜索新闻数据 ===\n{search_content}\n")
+        all_content = "".join(content_parts)
         
         if not all_content:
             return "❌ 未获取到任何新闻数据进行分析", []
@@ -981,29 +1466,42 @@ akshare数据：来自官方财经接口的权威数据
                 "model": "deepseek-chat",
                 "messages": [{"role": "user", "content": analysis_prompt}],
                 "temperature": 0.1,
-                "max_tokens": 6000
+                "max_tokens": 6000,
+                "stream": True
             }
             
-            response = self.requests.post(self.deepseek_url, headers=headers, json=data, timeout=120)
+            # 请求体（模型、参数、提示词）完全相同时复用有效期内的分析结果，跳过LLM调用
+            body = json_dumps_bytes(data)
+            request_hash = hashlib.sha256(body).hexdigest()
+            cached_analysis = self._load_cached_analysis(request_hash)
+            if cached_analysis is not None:
+                print("  💾 命中AI分析缓存")
+                return cached_analysis, news_citations
+            
+            # 流式接收（SSE）：超时按单次读取计算，长报告不会因整体耗时超过120秒而失败
+            request = self._http_client.build_request('POST', self.deepseek_url, headers=headers,
+                                                      content=body, timeout=120)
+            response = self._rate_limited(self.deepseek_url,
+                                          lambda: self._http_client.send(request, stream=True))
+            
+            try:
+                if response.status_code != 200:
+                    return f"❌ AI分析请求失败 (状态码: {response.status_code})", []
+                analysis_result = self._read_stream_content(response)
+            finally:
+                response.close()
+            
+            # 检测虚假内容
+            if FAKE_CONTENT_PATTERN.search(analysis_result):
+                return f"❌ 检测到可能的虚假内容，拒绝输出", []
+            
+            # 清理Markdown符号
+            clean_analysis = self._clean_markdown_symbols(analysis_result)
+            self._store_analysis(request_hash, clean_analysis)
+            
+            print("  ✅ AI专业分析完成")
+            return clean_analysis, news_citations
             
-            if response.status_code == 200:
-                result = response.json()
-                analysis_result = result['choices'][0]['message']['content']
-                
-                # 检测虚假内容
-                fake_indicators = ["模拟新闻", "假设新闻", "(新闻", "编造", "虚构"]
-                for indicator in fake_indicators:
-                    if indicator in analysis_result:
-                        return f"❌ 检测到可能的虚假内容，拒绝输出", []
-                
-                # 清理Markdown符号
-                clean_analysis = self._clean_markdown_symbols(analysis_result)
-                
-                print("  ✅ AI专业分析完成")
-                return clean_analysis, news_citations
-            else:
-                return f"❌ AI分析请求失败 (状态码: {response.status_code})", []
-                
         except Exception as e:
             return f"❌ AI分析出错: {str(e)}", []
     
@@ -1093,7 +1591,7 @@ akshare数据：来自官方财经接口的权威数据
             # 生成专业报告文件
             filename = f"{commodity}_专业分析报告_{target_date.strftime('%Y%m%d')}_{datetime.now().strftime('%H%M%S')}.txt"
             
-            report_content = f"""{commodity}期货专业新闻分析报告
+            report_parts = [f"""{commodity}期货专业新闻分析报告
 
 ========================================
 报告信息
@@ -1125,19 +1623,18 @@ akshare权威数据: {akshare_count} 条（官方财经接口）
 ========================================
 新闻来源和链接
 ========================================
-"""
+"""]
             
-            # 添加新闻引用
-            for i, citation in enumerate(all_citations, 1):
-                report_content += f"""
+            # 添加新闻引用（收集各段后一次拼接，避免循环中反复拼接长字符串）
+            report_parts.extend(f"""
 [{i}] {citation['title']}
 来源: {citation['source']}
 日期: {citation['date']}
 链接: {citation['url']}
 类型: {citation.get('type', '未知')}
-"""
+""" for i, citation in enumerate(all_citations, 1))
             
-            report_content += f"""
+            report_parts.append(f"""
 ========================================
 技术说明
 ========================================
@@ -1158,10 +1655,11 @@ AI模型: DeepSeek Chat
 
 免责声明: 本报告基于公开新闻数据进行AI分析，仅供参考，不构成投资建议。
 报告生成: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            """
+            """)
+            report_content = "".join(report_parts)
             
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
+                with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
                     f.write(report_content)
                 print(f"\n💾 专业报告已保存: {filename}")
             except Exception as e:
@@ -1201,6 +1699,9 @@ def main():
         analyzer = ProfessionalFuturesNewsAnalyzer(
             deepseek_api_key=DEEPSEEK_API_KEY
         )
+        if '--no-cache' in sys.argv[1:]:
+            analyzer.clear_http_cache()
+            analyzer.clear_news_cache()
         analyzer.run_professional_analysis()
     except Exception as e:
         print(f"❌ 系统启动失败: {e}")